@@ -0,0 +1,35 @@
+"""company_manager_version
+
+Revision ID: 0a4d6f93c2e5
+Revises: c6e8b2f14a97
+Create Date: 2026-10-19 15:20:09.774251
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0a4d6f93c2e5"
+down_revision: Union[str, None] = "c6e8b2f14a97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("companies", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "manager_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("companies", schema=None) as batch_op:
+        batch_op.drop_column("manager_version")
@@ -0,0 +1,76 @@
+"""task_list_indexes
+
+Revision ID: 3a8c5e1d2f90
+Revises: e9f41c0b7a26
+Create Date: 2026-10-19 18:11:23.508774
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a8c5e1d2f90"
+down_revision: Union[str, None] = "e9f41c0b7a26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("tasks", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("company_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "tasks_company_id_fkey", "companies", ["company_id"], ["id"]
+        )
+
+    op.execute(
+        """
+        UPDATE tasks
+        SET company_id = users.company_id
+        FROM users
+        WHERE users.id = tasks.author_id
+        """
+    )
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM tasks WHERE company_id IS NULL) THEN
+                RAISE EXCEPTION
+                    'tasks without a resolvable author company; fix them first';
+            END IF;
+        END $$
+        """
+    )
+    op.alter_column(
+        "tasks", "company_id", existing_type=sa.Integer(), nullable=False
+    )
+
+    op.create_index(
+        "ix_tasks_company_responsible",
+        "tasks",
+        ["company_id", "responsible_id", "id"],
+    )
+    op.create_index(
+        "ix_tasks_company_author", "tasks", ["company_id", "author_id", "id"]
+    )
+    op.create_index("ix_tasks_company_status", "tasks", ["company_id", "status", "id"])
+    op.create_index(
+        "ix_task_observers_user_task", "task_observers", ["user_id", "task_id"]
+    )
+    op.create_index(
+        "ix_task_executors_user_task", "task_executors", ["user_id", "task_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_executors_user_task", table_name="task_executors")
+    op.drop_index("ix_task_observers_user_task", table_name="task_observers")
+    op.drop_index("ix_tasks_company_status", table_name="tasks")
+    op.drop_index("ix_tasks_company_author", table_name="tasks")
+    op.drop_index("ix_tasks_company_responsible", table_name="tasks")
+    with op.batch_alter_table("tasks", schema=None) as batch_op:
+        batch_op.drop_constraint("tasks_company_id_fkey", type_="foreignkey")
+        batch_op.drop_column("company_id")
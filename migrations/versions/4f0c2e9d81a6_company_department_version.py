@@ -0,0 +1,35 @@
+"""company_department_version
+
+Revision ID: 4f0c2e9d81a6
+Revises: b3d1f0a7c5e2
+Create Date: 2026-10-19 11:03:17.540118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f0c2e9d81a6"
+down_revision: Union[str, None] = "b3d1f0a7c5e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("companies", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "department_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("companies", schema=None) as batch_op:
+        batch_op.drop_column("department_version")
@@ -0,0 +1,40 @@
+"""users_directory_indexes
+
+Revision ID: 5d2b9e7f0c31
+Revises: 0a4d6f93c2e5
+Create Date: 2026-10-19 16:05:38.402913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2b9e7f0c31"
+down_revision: Union[str, None] = "0a4d6f93c2e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in ("first_name", "last_name", "email"):
+        op.create_index(
+            f"ix_users_{column}_trgm",
+            "users",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+    op.create_index(
+        "ix_users_directory",
+        "users",
+        ["company_id", "last_name", "first_name", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_directory", table_name="users")
+    for column in ("email", "last_name", "first_name"):
+        op.drop_index(f"ix_users_{column}_trgm", table_name="users")
@@ -0,0 +1,35 @@
+"""company_role_version
+
+Revision ID: 7b3e1a5c9d42
+Revises: 5d2b9e7f0c31
+Create Date: 2026-10-19 16:52:27.035518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b3e1a5c9d42"
+down_revision: Union[str, None] = "5d2b9e7f0c31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("companies", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "role_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("companies", schema=None) as batch_op:
+        batch_op.drop_column("role_version")
@@ -0,0 +1,34 @@
+"""departments_name_trgm
+
+Revision ID: 91c5d7e3a0b8
+Revises: e27a9c4b6d13
+Create Date: 2026-10-19 13:21:44.602817
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "91c5d7e3a0b8"
+down_revision: Union[str, None] = "e27a9c4b6d13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_departments_name_trgm",
+        "departments",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index("ix_departments_company_id", "departments", ["company_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_departments_company_id", table_name="departments")
+    op.drop_index("ix_departments_name_trgm", table_name="departments")
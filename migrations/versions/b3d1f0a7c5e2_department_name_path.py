@@ -0,0 +1,40 @@
+"""department_name_path
+
+Revision ID: b3d1f0a7c5e2
+Revises: 8744bbe23731
+Create Date: 2026-10-19 10:12:41.208391
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d1f0a7c5e2"
+down_revision: Union[str, None] = "8744bbe23731"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("departments", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("name_path", sa.String(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE departments AS d
+        SET name_path = (
+            SELECT string_agg(a.name, '.' ORDER BY nlevel(a.path))
+            FROM departments AS a
+            WHERE a.path @> d.path
+        )
+        WHERE d.path IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("departments", schema=None) as batch_op:
+        batch_op.drop_column("name_path")
@@ -0,0 +1,58 @@
+"""task_deadline_timestamptz
+
+Revision ID: b7d2e4f6a813
+Revises: 3a8c5e1d2f90
+Create Date: 2026-10-19 19:02:41.417305
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d2e4f6a813"
+down_revision: Union[str, None] = "3a8c5e1d2f90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Strings that do not parse as timestamps become NULL instead of
+    # failing the migration; naive values are read as UTC.
+    op.execute(
+        """
+        CREATE FUNCTION pg_temp.try_timestamptz(value text)
+        RETURNS timestamptz AS $$
+        BEGIN
+            RETURN NULLIF(btrim(value), '')::timestamptz;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql STABLE
+        """
+    )
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    op.alter_column(
+        "tasks",
+        "deadline",
+        type_=sa.DateTime(timezone=True),
+        existing_type=sa.String(),
+        existing_nullable=True,
+        postgresql_using="pg_temp.try_timestamptz(deadline)",
+    )
+    op.create_index("ix_tasks_status_deadline", "tasks", ["status", "deadline"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_status_deadline", table_name="tasks")
+    op.alter_column(
+        "tasks",
+        "deadline",
+        type_=sa.String(),
+        existing_type=sa.DateTime(timezone=True),
+        existing_nullable=True,
+        postgresql_using="to_char(deadline AT TIME ZONE 'UTC', "
+        "'YYYY-MM-DD\"T\"HH24:MI:SS\"Z\"')",
+    )
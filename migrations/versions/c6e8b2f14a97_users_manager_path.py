@@ -0,0 +1,60 @@
+"""users_manager_path
+
+Revision ID: c6e8b2f14a97
+Revises: 91c5d7e3a0b8
+Create Date: 2026-10-19 14:37:52.118640
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c6e8b2f14a97"
+down_revision: Union[str, None] = "91c5d7e3a0b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "manager_path",
+                sqlalchemy_utils.types.ltree.LtreeType(),
+                nullable=True,
+            )
+        )
+
+    op.execute(
+        """
+        WITH RECURSIVE chain AS (
+            SELECT id, text2ltree(id::text) AS path
+            FROM users
+            WHERE manager_id IS NULL
+            UNION ALL
+            SELECT u.id, c.path || text2ltree(u.id::text)
+            FROM users AS u
+            JOIN chain AS c ON u.manager_id = c.id
+        )
+        UPDATE users
+        SET manager_path = chain.path
+        FROM chain
+        WHERE users.id = chain.id
+        """
+    )
+    op.create_index(
+        "ix_users_manager_path_gist",
+        "users",
+        ["manager_path"],
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_manager_path_gist", table_name="users")
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("manager_path")
@@ -0,0 +1,30 @@
+"""departments_path_gist
+
+Revision ID: e27a9c4b6d13
+Revises: 4f0c2e9d81a6
+Create Date: 2026-10-19 11:48:05.917362
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e27a9c4b6d13"
+down_revision: Union[str, None] = "4f0c2e9d81a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_departments_path_gist",
+        "departments",
+        ["path"],
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_departments_path_gist", table_name="departments")
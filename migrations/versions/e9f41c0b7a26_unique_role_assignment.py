@@ -0,0 +1,41 @@
+"""unique_role_assignment
+
+Revision ID: e9f41c0b7a26
+Revises: 7b3e1a5c9d42
+Create Date: 2026-10-19 17:34:50.661930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e9f41c0b7a26"
+down_revision: Union[str, None] = "7b3e1a5c9d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM role_assignments AS a
+        USING role_assignments AS b
+        WHERE a.user_id = b.user_id
+          AND a.department_id = b.department_id
+          AND a.role_name = b.role_name
+          AND a.id > b.id
+        """
+    )
+    op.create_unique_constraint(
+        "unique_role_assignment",
+        "role_assignments",
+        ["user_id", "department_id", "role_name"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "unique_role_assignment", "role_assignments", type_="unique"
+    )
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import EmailStr
 
 from schemas.schemas import (
@@ -13,6 +13,7 @@ from schemas.schemas import (
     SignUpRequestSchema,
     SignUpResponseSchema,
     TokenInfo,
+    UserResponse,
     UserToken,
     UserUpdateRequest,
 )
@@ -61,6 +62,21 @@ async def invite_employee(
     return await service.invite_employee(email=email, company_id=company_id)
 
 
+@router.get("/api/v1/users", response_model=List[UserResponse])
+async def get_users(
+    ids: str,
+    service: AuthService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+) -> List[UserResponse]:
+    try:
+        user_ids = list(dict.fromkeys(int(value) for value in ids.split(",") if value))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers.")
+    if len(user_ids) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 ids are allowed.")
+    return await service.get_users(user_ids=user_ids, current_user=current_user)
+
+
 @router.patch("/api/v1/user/{user_id}")
 async def update_user(
     user_id: int,
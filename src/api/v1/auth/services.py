@@ -14,6 +14,7 @@ from schemas.schemas import (
     SignUpRequestSchema,
     SignUpResponseSchema,
     TokenInfo,
+    UserResponse,
     UserToken,
     UserUpdateRequest,
 )
@@ -208,6 +209,19 @@ class AuthService(BaseService):
             "updated_fields": list(updates.keys()),
         }
 
+    @transaction_mode
+    async def get_users(
+        self,
+        user_ids: list[int],
+        current_user: UserToken,
+    ) -> list[UserResponse]:
+        rows = await self.uow.user.get_by_ids(user_ids)
+        return [
+            UserResponse.model_validate(row)
+            for row in rows
+            if row.company_id == current_user.company_id
+        ]
+
     @transaction_mode
     async def update_email(
         self,
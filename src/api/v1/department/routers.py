@@ -1,8 +1,20 @@
-from typing import Optional
-
-from fastapi import APIRouter, Depends
-
-from schemas.schemas import UserToken
+import csv
+import io
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from schemas.schemas import (
+    DepartmentImportRequest,
+    DepartmentReorganizeRequest,
+    EmployeeDirectoryPage,
+    RoleAssignmentBulkRequest,
+    SubordinatePage,
+    SubtreeDeletePolicy,
+    UserToken,
+)
+from utils.org_import import flatten_import_tree, parse_import_csv
 from utils.utils import get_current_user
 
 from .services import OrganizationService
@@ -25,6 +37,38 @@ async def create_department(
     )
 
 
+@router.post("/api/v1/department/import")
+async def import_departments(
+    schema: DepartmentImportRequest,
+    current_user: UserToken = Depends(get_current_user),
+    service: OrganizationService = Depends(),
+):
+    return await service.import_departments(
+        rows=flatten_import_tree(schema.departments),
+        parent_id=schema.parent_id,
+        current_user=current_user,
+    )
+
+
+@router.post("/api/v1/department/import-csv")
+async def import_departments_csv(
+    request: Request,
+    parent_id: Optional[int] = None,
+    current_user: UserToken = Depends(get_current_user),
+    service: OrganizationService = Depends(),
+):
+    body = await request.body()
+    try:
+        rows = parse_import_csv(body.decode("utf-8-sig"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await service.import_departments(
+        rows=rows,
+        parent_id=parent_id,
+        current_user=current_user,
+    )
+
+
 @router.get("/api/v1/department/{department_id}/descendants")
 async def get_descendants(
     department_id: int,
@@ -49,6 +93,64 @@ async def get_ancestors(
     )
 
 
+@router.get("/api/v1/department/{department_id}/children")
+async def get_children(
+    department_id: int,
+    after: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.get_children(
+        department_id,
+        current_user=current_user,
+        after=after,
+        limit=limit,
+    )
+
+
+@router.get("/api/v1/departments/search")
+async def search_departments(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.search_departments(
+        q=q,
+        limit=limit,
+        current_user=current_user,
+    )
+
+
+@router.get("/api/v1/departments/stats")
+async def get_subtree_stats(
+    department_id: Optional[int] = None,
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.get_subtree_stats(
+        current_user=current_user,
+        department_id=department_id,
+    )
+
+
+@router.get("/api/v1/org-chart")
+async def get_org_chart(
+    request: Request,
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    chart = await service.get_org_chart(
+        current_user=current_user,
+        etag=request.headers.get("if-none-match"),
+    )
+    headers = {"ETag": chart["etag"]}
+    if chart["departments"] is None:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=chart["departments"], headers=headers)
+
+
 @router.patch("/api/v1/department/{department_id}/move")
 async def move_department(
     department_id: int,
@@ -63,6 +165,18 @@ async def move_department(
     )
 
 
+@router.post("/api/v1/department/reorganize")
+async def reorganize_departments(
+    schema: DepartmentReorganizeRequest,
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.reorganize_departments(
+        moves=schema.moves,
+        current_user=current_user,
+    )
+
+
 @router.patch("/api/v1/department/{department_id}")
 async def update_department(
     department_id: int,
@@ -82,11 +196,13 @@ async def update_department(
 @router.delete("/departments/{department_id}")
 async def delete_department(
     department_id: int,
+    policy: SubtreeDeletePolicy = SubtreeDeletePolicy.DETACH,
     service: OrganizationService = Depends(),
     current_user: UserToken = Depends(get_current_user),
 ):
     return await service.delete_department(
         department_id=department_id,
+        policy=policy,
         current_user=current_user
     )
 
@@ -176,14 +292,113 @@ async def assign_position_to_user(
     )
 
 
-@router.get("/api/v1/employees/{user_id}/subordinates/")
-async def get_subordinates(
+@router.get("/api/v1/analytics/span-of-control")
+async def get_span_of_control(
+    format: Literal["json", "csv"] = "json",
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    report = await service.get_span_of_control(current_user=current_user)
+    if format == "json":
+        return report
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer,
+        fieldnames=[
+            "manager_id",
+            "first_name",
+            "last_name",
+            "department_id",
+            "direct_reports",
+            "indirect_reports",
+            "total_reports",
+            "depth",
+        ],
+    )
+    writer.writeheader()
+    writer.writerows(report)
+    return Response(
+        content=buffer.getvalue(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="span-of-control.csv"'},
+    )
+
+
+@router.get("/api/v1/employees/search", response_model=EmployeeDirectoryPage)
+async def search_employees(
+    q: Optional[str] = None,
+    department_id: Optional[int] = None,
+    position_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+) -> EmployeeDirectoryPage:
+    return await service.search_employees(
+        q=q,
+        department_id=department_id,
+        position_id=position_id,
+        cursor=cursor,
+        limit=limit,
+        current_user=current_user,
+    )
+
+
+@router.get("/api/v1/employees/managers")
+async def get_manager_chains(
+    user_ids: List[int] = Query(...),
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.get_manager_chains(
+        user_ids=user_ids,
+        current_user=current_user,
+    )
+
+
+@router.get("/api/v1/employees/{user_id}/managers")
+async def get_manager_chain(
+    user_id: int,
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.get_manager_chain(
+        user_id=user_id,
+        current_user=current_user,
+    )
+
+
+@router.patch("/api/v1/employees/{user_id}/manager")
+async def set_manager(
     user_id: int,
+    manager_id: Optional[int] = None,
     service: OrganizationService = Depends(),
     current_user: UserToken = Depends(get_current_user),
 ):
+    return await service.set_manager(
+        user_id=user_id,
+        manager_id=manager_id,
+        current_user=current_user,
+    )
+
+
+@router.get(
+    "/api/v1/employees/{user_id}/subordinates/", response_model=SubordinatePage
+)
+async def get_subordinates(
+    user_id: int,
+    max_depth: Optional[int] = Query(None, ge=1),
+    after: Optional[int] = None,
+    limit: int = Query(1000, ge=1, le=50000),
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+) -> SubordinatePage:
     return await service.get_subordinates(
         user_id=user_id,
+        max_depth=max_depth,
+        after=after,
+        limit=limit,
         current_user=current_user
     )
 
@@ -204,6 +419,28 @@ async def assign_role(
     )
 
 
+@router.post("/api/v1/roles/bulk-assign/")
+async def bulk_assign_roles(
+    schema: RoleAssignmentBulkRequest,
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.bulk_assign_roles(
+        schema.assignments, current_user=current_user
+    )
+
+
+@router.post("/api/v1/roles/bulk-revoke/")
+async def bulk_revoke_roles(
+    schema: RoleAssignmentBulkRequest,
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.bulk_revoke_roles(
+        schema.assignments, current_user=current_user
+    )
+
+
 @router.get("/api/v1/users/{user_id}/roles/")
 async def get_roles(
     user_id: int,
@@ -211,3 +448,15 @@ async def get_roles(
     current_user: UserToken = Depends(get_current_user),
 ):
     return await service.get_roles(user_id, current_user=current_user)
+
+
+@router.get("/api/v1/users/{user_id}/effective-roles/")
+async def get_effective_roles(
+    user_id: int,
+    department_id: int,
+    service: OrganizationService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+):
+    return await service.get_effective_roles(
+        user_id, department_id, current_user=current_user
+    )
@@ -1,14 +1,50 @@
-from typing import Optional
+from typing import Any, Optional
 
 from fastapi import HTTPException
 
-from schemas.schemas import UserToken
+from schemas.schemas import (
+    DepartmentMove,
+    EmployeeDirectoryPage,
+    RoleAssignmentItem,
+    SubordinatePage,
+    SubordinateResponse,
+    SubtreeDeletePolicy,
+    UserResponse,
+    UserToken,
+)
+from utils.cache import VersionedCache
+from utils.org_import import ImportRow, order_import_rows
+from utils.org_tree import (
+    OrgTree,
+    build_org_chart,
+    get_org_tree,
+    plan_reorganization,
+)
+from utils.pagination import decode_cursor, encode_cursor
+from utils.permissions import resolve_effective_roles
 from utils.service import BaseService
 from utils.unit_of_work import transaction_mode
-from sqlalchemy_utils.types.ltree import Ltree
+
+subtree_stats_cache = VersionedCache(ttl=5)
+manager_chain_cache = VersionedCache(maxsize=100_000)
+span_of_control_cache = VersionedCache()
 
 
 class OrganizationService(BaseService):
+    async def _get_org_tree(self, company_id: int) -> OrgTree:
+        return await get_org_tree(self.uow.department, company_id)
+
+    async def _lock_company(self, company_id: int) -> Any:
+        """Take the company row lock that serializes department writes.
+
+        Must run before the transaction reads any department path, so
+        paths read afterwards cannot be rewritten until it commits.
+        """
+        versions = await self.uow.company.lock_versions(company_id)
+        if versions is None:
+            raise HTTPException(status_code=404, detail="Company not found")
+        return versions
+
     @transaction_mode
     async def create_department(
         self,
@@ -19,6 +55,7 @@ class OrganizationService(BaseService):
     ) -> dict:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
+        await self._lock_company(company_id)
 
         department_id = await self.uow.department.add_one(
             name=name, company_id=company_id, parent_id=parent_id
@@ -31,6 +68,54 @@ class OrganizationService(BaseService):
             "visualized_path": visualized_path,
         }
 
+    @transaction_mode
+    async def import_departments(
+        self,
+        rows: list[ImportRow],
+        current_user: UserToken,
+        parent_id: Optional[int] = None,
+    ) -> dict:
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        await self._lock_company(current_user.company_id)
+
+        try:
+            ordered = order_import_rows(rows)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        root_path, root_name_path = None, None
+        if parent_id is not None:
+            parent = await self.uow.department.get_by_id(parent_id)
+            if not parent or parent.company_id != current_user.company_id:
+                raise HTTPException(status_code=404, detail="Parent department not found")
+            root_path, root_name_path = str(parent.path), parent.name_path
+
+        ids = await self.uow.department.reserve_ids(len(ordered))
+        placed: dict[str, tuple[str, str]] = {}
+        department_ids: dict[str, int] = {}
+        departments = []
+        for (ref, parent_ref, name), dep_id in zip(ordered, ids):
+            if parent_ref is None:
+                base_path, base_name_path = root_path, root_name_path
+            else:
+                base_path, base_name_path = placed[parent_ref]
+
+            path = f"{base_path}.{dep_id}" if base_path else str(dep_id)
+            name_path = f"{base_name_path}.{name}" if base_name_path else name
+            placed[ref] = (path, name_path)
+            department_ids[ref] = dep_id
+            departments.append(
+                {"id": dep_id, "name": name, "path": path, "name_path": name_path}
+            )
+
+        await self.uow.department.add_many(current_user.company_id, departments)
+        return {
+            "message": "Departments imported successfully",
+            "imported": len(departments),
+            "department_ids": department_ids,
+        }
+
     @transaction_mode
     async def get_descendants(
         self,
@@ -39,8 +124,13 @@ class OrganizationService(BaseService):
     ) -> list:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
-        descendants = await self.uow.department.get_descendants_with_names(department_id)
-        return descendants
+        tree = await self._get_org_tree(current_user.company_id)
+        if department_id not in tree:
+            raise HTTPException(status_code=404, detail="Department not found")
+        return [
+            tree.visualized_path(tree.ids[pos])
+            for pos in tree.descendants(department_id)
+        ]
 
     @transaction_mode
     async def get_ancestors(
@@ -50,8 +140,125 @@ class OrganizationService(BaseService):
     ) -> list:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
-        ancestors = await self.uow.department.get_ancestors_with_names(department_id)
-        return ancestors
+        tree = await self._get_org_tree(current_user.company_id)
+        if department_id not in tree:
+            raise HTTPException(status_code=404, detail="Department not found")
+        return [
+            tree.visualized_path(tree.ids[pos])
+            for pos in tree.ancestors(department_id)
+        ]
+
+    @transaction_mode
+    async def get_children(
+        self,
+        department_id: int,
+        current_user: UserToken,
+        after: Optional[int] = None,
+        limit: int = 50,
+    ) -> dict:
+        department = await self.uow.department.get_by_id(department_id)
+        if not department or department.company_id != current_user.company_id:
+            raise HTTPException(status_code=404, detail="Department not found")
+
+        rows = await self.uow.department.get_children(
+            department_id, after=after, limit=limit + 1
+        )
+        # Subtree sizes come from the cached tree's pre-order intervals.
+        tree = await self._get_org_tree(current_user.company_id)
+        items = []
+        for row in rows[:limit]:
+            descendant_count = (
+                tree.descendant_count(row.id) if row.id in tree else 0
+            )
+            items.append(
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "manager_id": row.manager_id,
+                    "visualized_path": row.name_path,
+                    "has_children": descendant_count > 0,
+                    "descendant_count": descendant_count,
+                }
+            )
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    @transaction_mode
+    async def get_subtree_stats(
+        self,
+        current_user: UserToken,
+        department_id: Optional[int] = None,
+    ) -> list:
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+
+        company_id = current_user.company_id
+        version = await self.uow.department.get_version(company_id)
+        stats = subtree_stats_cache.get(company_id, version)
+        if stats is None:
+            rows = await self.uow.department.get_subtree_stats(company_id)
+            stats = [
+                {
+                    "department_id": row.id,
+                    "visualized_path": row.name_path,
+                    "headcount": row.headcount,
+                    "active_count": row.active_count,
+                    "open_tasks": row.open_tasks,
+                    "estimated_time": float(row.estimated_time),
+                }
+                for row in rows
+            ]
+            subtree_stats_cache.put(company_id, version, stats)
+
+        if department_id is None:
+            return stats
+        filtered = [item for item in stats if item["department_id"] == department_id]
+        if not filtered:
+            raise HTTPException(status_code=404, detail="Department not found")
+        return filtered
+
+    @transaction_mode
+    async def search_departments(
+        self,
+        q: str,
+        current_user: UserToken,
+        limit: int = 20,
+    ) -> list:
+        rows = await self.uow.department.search_by_name(
+            current_user.company_id, q, limit=limit
+        )
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "visualized_path": row.name_path,
+                "similarity": row.similarity,
+            }
+            for row in rows
+        ]
+
+    @transaction_mode
+    async def get_org_chart(
+        self,
+        current_user: UserToken,
+        etag: Optional[str] = None,
+    ) -> dict:
+        # Manager names come from users, so user writes (manager_version)
+        # invalidate the chart as well as department writes.
+        versions = await self.uow.company.get_versions(current_user.company_id)
+        if versions is None:
+            raise HTTPException(status_code=404, detail="Company not found")
+        current_etag = (
+            f'"org-chart-{current_user.company_id}-'
+            f'{versions.department_version}-{versions.manager_version}"'
+        )
+        if etag is not None and current_etag in {
+            tag.strip().removeprefix("W/") for tag in etag.split(",")
+        }:
+            return {"etag": current_etag, "departments": None}
+
+        rows = await self.uow.department.get_org_chart_rows(current_user.company_id)
+        return {"etag": current_etag, "departments": build_org_chart(rows)}
 
     @transaction_mode
     async def move_department(
@@ -62,15 +269,22 @@ class OrganizationService(BaseService):
     ) -> dict:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
+        await self._lock_company(current_user.company_id)
+        department = await self.uow.department.get_by_id(department_id)
+        if not department or department.company_id != current_user.company_id:
+            raise HTTPException(status_code=404, detail="Department not found")
         new_parent = await self.uow.department.get_by_id(new_parent_id)
-        if not new_parent:
+        if not new_parent or new_parent.company_id != current_user.company_id:
             raise HTTPException(
                 status_code=404, detail="New parent department not found"
             )
 
-        await self.uow.department.move_department_with_descendants(
-            department_id, new_parent.path
-        )
+        try:
+            await self.uow.department.move_department_with_descendants(
+                department_id, new_parent.path, new_parent.name_path
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         visualized_path = await self.uow.department.get_visualized_path(department_id)
 
         return {
@@ -78,6 +292,40 @@ class OrganizationService(BaseService):
             "new_visualized_path": visualized_path,
         }
 
+    @transaction_mode
+    async def reorganize_departments(
+        self,
+        moves: list[DepartmentMove],
+        current_user: UserToken,
+    ) -> dict:
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+
+        planned_moves = {}
+        for move in moves:
+            if move.department_id in planned_moves:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Department {move.department_id} is moved more than once",
+                )
+            planned_moves[move.department_id] = move.new_parent_id
+
+        # Plan against the tree version seen under the lock, so no other
+        # department write lands between planning and applying.
+        versions = await self._lock_company(current_user.company_id)
+        tree = await get_org_tree(
+            self.uow.department, current_user.company_id, versions.department_version
+        )
+        try:
+            updates = plan_reorganization(tree, planned_moves)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        updated = await self.uow.department.apply_paths(
+            current_user.company_id, updates
+        )
+        return {"message": "Departments reorganized successfully", "updated": updated}
+
     @transaction_mode
     async def update_department(
         self,
@@ -88,39 +336,39 @@ class OrganizationService(BaseService):
     ) -> dict:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
+        await self._lock_company(current_user.company_id)
 
         department = await self.uow.department.get_by_id(department_id)
-        if not department:
+        if not department or department.company_id != current_user.company_id:
             raise HTTPException(status_code=404, detail="Department not found")
 
-        updates = {}
-        if name is not None:
-            updates["name"] = name
-
-        old_path = department.path
-
+        new_parent = None
         if parent_id is not None:
             new_parent = await self.uow.department.get_by_id(parent_id)
-            if not new_parent:
+            if not new_parent or new_parent.company_id != current_user.company_id:
                 raise HTTPException(status_code=404, detail="New parent department not found")
             if not new_parent.path:
                 raise HTTPException(status_code=400, detail="New parent path is not set")
+            old_path = str(department.path)
+            new_parent_path = str(new_parent.path)
+            if new_parent_path == old_path or new_parent_path.startswith(f"{old_path}."):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Department cannot be moved into its own subtree",
+                )
+
+        # All checks are done; the writes below share one transaction.
+        if new_parent is not None:
+            try:
+                await self.uow.department.move_department_with_descendants(
+                    department_id, new_parent.path, new_parent.name_path
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        if name is not None and name != department.name:
+            await self.uow.department.rename_department(department_id, name)
 
-            new_path = f"{new_parent.path}.{department.id}"
-            updates["path"] = new_path
-
-            department.path = Ltree(new_path)
-            self.uow.department.session.add(department)
-
-            descendants = await self.uow.department.get_descendants(department_id)
-            for descendant in descendants:
-                relative_path = descendant.path[len(old_path) + 1:]
-                descendant.path = Ltree(f"{new_path}.{relative_path}")
-                self.uow.department.session.add(descendant)
-
-        if updates:
-            await self.uow.department.update_one_by_id(obj_id=department_id, **updates)
-        await self.uow.department.session.commit()
         return {"message": "Department updated successfully."}
 
     @transaction_mode
@@ -128,16 +376,24 @@ class OrganizationService(BaseService):
         self,
         department_id: int,
         current_user: UserToken,
+        policy: SubtreeDeletePolicy = SubtreeDeletePolicy.DETACH,
     ) -> dict:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
+        await self._lock_company(current_user.company_id)
 
         department = await self.uow.department.get_by_id(department_id)
-        if not department:
+        if not department or department.company_id != current_user.company_id:
             raise HTTPException(status_code=404, detail="Department not found")
 
-        await self.uow.department.delete_by_query(department_id=department_id)
-        return {"message": "Department deleted successfully"}
+        try:
+            deleted = await self.uow.department.delete_by_query(
+                department_id=department_id,
+                reparent=policy == SubtreeDeletePolicy.REPARENT,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"message": "Department deleted successfully", "deleted": deleted}
 
     @transaction_mode
     async def create_position(
@@ -247,23 +503,161 @@ class OrganizationService(BaseService):
     ) -> dict:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
+        await self._lock_company(current_user.company_id)
         department = await self.uow.department.get_by_id(department_id)
-        if not department:
+        if not department or department.company_id != current_user.company_id:
             raise HTTPException(status_code=404, detail="Department not found")
 
         await self.uow.department.update_one_by_id(department_id, manager_id=user_id)
         return {"message": "Manager assigned successfully"}
 
+    @transaction_mode
+    async def set_manager(
+        self,
+        user_id: int,
+        manager_id: Optional[int],
+        current_user: UserToken,
+    ) -> dict:
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+
+        user_ids = {user_id} if manager_id is None else {user_id, manager_id}
+        users = await self.uow.user.get_by_ids(user_ids)
+        if len(users) != len(user_ids) or any(
+            user.company_id != current_user.company_id for user in users
+        ):
+            raise HTTPException(status_code=404, detail="User or manager not found.")
+
+        try:
+            updated = await self.uow.user.set_manager(user_id, manager_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"message": "Manager updated successfully.", "updated": updated}
+
+    @transaction_mode
+    async def get_manager_chains(
+        self,
+        user_ids: list[int],
+        current_user: UserToken,
+    ) -> dict[int, list[dict]]:
+        company_id = current_user.company_id
+        version = await self.uow.user.get_version(company_id)
+
+        chains = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            chain = manager_chain_cache.get((company_id, user_id), version)
+            if chain is None:
+                missing.append(user_id)
+            else:
+                chains[user_id] = chain
+
+        if missing:
+            fetched: dict[int, list[dict]] = {}
+            rows = await self.uow.user.get_manager_chains(company_id, missing)
+            for row in rows:
+                chain = fetched.setdefault(row.user_id, [])
+                if row.id is not None:
+                    chain.append(
+                        {
+                            "id": row.id,
+                            "first_name": row.first_name,
+                            "last_name": row.last_name,
+                            "email": row.email,
+                            "position_id": row.position_id,
+                            "department_id": row.department_id,
+                        }
+                    )
+            for user_id, chain in fetched.items():
+                manager_chain_cache.put((company_id, user_id), version, chain)
+            chains.update(fetched)
+
+        return chains
+
+    async def get_manager_chain(
+        self,
+        user_id: int,
+        current_user: UserToken,
+    ) -> list[dict]:
+        chains = await self.get_manager_chains([user_id], current_user=current_user)
+        if user_id not in chains:
+            raise HTTPException(status_code=404, detail="User not found.")
+        return chains[user_id]
+
+    @transaction_mode
+    async def search_employees(
+        self,
+        current_user: UserToken,
+        q: Optional[str] = None,
+        department_id: Optional[int] = None,
+        position_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> EmployeeDirectoryPage:
+        rows = await self.uow.user.search_directory(
+            current_user.company_id,
+            q=q,
+            department_id=department_id,
+            position_id=position_id,
+            after=decode_cursor(cursor, (str, str, int)),
+            limit=limit + 1,
+        )
+        items = [UserResponse.model_validate(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor([last.last_name, last.first_name, last.id])
+        return EmployeeDirectoryPage(items=items, next_cursor=next_cursor)
+
+    @transaction_mode
+    async def get_span_of_control(self, current_user: UserToken) -> list[dict]:
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+
+        company_id = current_user.company_id
+        version = await self.uow.user.get_version(company_id)
+        report = span_of_control_cache.get(company_id, version)
+        if report is None:
+            rows = await self.uow.user.get_span_of_control(company_id)
+            report = [
+                {
+                    "manager_id": row.id,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "department_id": row.department_id,
+                    "direct_reports": row.direct_reports,
+                    "indirect_reports": row.total_reports - row.direct_reports,
+                    "total_reports": row.total_reports,
+                    "depth": row.depth,
+                }
+                for row in rows
+            ]
+            span_of_control_cache.put(company_id, version, report)
+        return report
+
     @transaction_mode
     async def get_subordinates(
         self,
         user_id: int,
         current_user: UserToken,
-    ) -> list:
-        if not current_user.is_admin and current_user.user_id != user_id:
+        max_depth: Optional[int] = None,
+        after: Optional[int] = None,
+        limit: int = 1000,
+    ) -> SubordinatePage:
+        # Admins, the user and anyone above them in the reporting line may
+        # list the user's subordinates.
+        if not (
+            current_user.is_admin
+            or current_user.user_id == user_id
+            or await self.uow.user.is_in_reporting_line(user_id, current_user.user_id)
+        ):
             raise HTTPException(status_code=403, detail="Permission denied")
-        subordinates = await self.uow.user.get_all_subordinates(user_id)
-        return [sub.dict() for sub in subordinates]
+        rows = await self.uow.user.get_all_subordinates(
+            user_id, max_depth=max_depth, after=after, limit=limit + 1
+        )
+        items = [SubordinateResponse.model_validate(row) for row in rows[:limit]]
+        next_cursor = items[-1].id if len(rows) > limit else None
+        return SubordinatePage(items=items, next_cursor=next_cursor)
 
     @transaction_mode
     async def assign_role(
@@ -286,6 +680,87 @@ class OrganizationService(BaseService):
         )
         return {"message": "Role assigned successfully."}
 
+    async def _validate_role_assignments(
+        self,
+        assignments: list[RoleAssignmentItem],
+        company_id: int,
+    ) -> list[tuple[int, int, str]]:
+        unique = list(
+            dict.fromkeys(
+                (item.user_id, item.department_id, item.role_name)
+                for item in assignments
+            )
+        )
+        user_ids = list({user_id for user_id, _, _ in unique})
+        department_ids = list({department_id for _, department_id, _ in unique})
+
+        missing_users = set(user_ids) - await self.uow.user.get_existing_ids(
+            company_id, user_ids
+        )
+        missing_departments = set(
+            department_ids
+        ) - await self.uow.department.get_existing_ids(company_id, department_ids)
+        if missing_users or missing_departments:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "message": "User or Department not found.",
+                    "user_ids": sorted(missing_users),
+                    "department_ids": sorted(missing_departments),
+                },
+            )
+        return unique
+
+    @transaction_mode
+    async def bulk_assign_roles(
+        self,
+        assignments: list[RoleAssignmentItem],
+        current_user: UserToken,
+    ) -> dict:
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        unique = await self._validate_role_assignments(
+            assignments, current_user.company_id
+        )
+        created = await self.uow.role_assignment.add_many(unique)
+        return {
+            "message": "Roles assigned successfully.",
+            "created": created,
+            "already_assigned": len(unique) - created,
+        }
+
+    @transaction_mode
+    async def bulk_revoke_roles(
+        self,
+        assignments: list[RoleAssignmentItem],
+        current_user: UserToken,
+    ) -> dict:
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        unique = await self._validate_role_assignments(
+            assignments, current_user.company_id
+        )
+        revoked = await self.uow.role_assignment.delete_many(unique)
+        return {"message": "Roles revoked successfully.", "revoked": revoked}
+
+    @transaction_mode
+    async def get_effective_roles(
+        self,
+        user_id: int,
+        department_id: int,
+        current_user: UserToken,
+    ) -> dict:
+        if not current_user.is_admin and current_user.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        roles = await resolve_effective_roles(
+            self.uow, current_user.company_id, user_id, department_id
+        )
+        return {
+            "user_id": user_id,
+            "department_id": department_id,
+            "roles": sorted(roles),
+        }
+
     @transaction_mode
     async def get_roles(
         self,
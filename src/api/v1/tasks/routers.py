@@ -1,6 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
 
-from schemas.schemas import TaskCreate, TaskUpdate, UserToken
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from models.models import TaskStatus
+from schemas.schemas import (
+    TaskBulkResult,
+    TaskCreate,
+    TaskPage,
+    TaskResponse,
+    TaskStatusBulkResult,
+    TaskStatusBulkUpdate,
+    TaskUpdate,
+    UserToken,
+)
+from utils.task_events import OVERFLOW, task_events
+from utils.task_import import parse_bulk_tasks
 from utils.unit_of_work import UnitOfWork, get_uow
 from utils.utils import get_current_user
 
@@ -8,8 +26,10 @@ from .services import TaskService
 
 router = APIRouter()
 
+KEEPALIVE_SECONDS = 15
+
 
-@router.post("/tasks")
+@router.post("/tasks", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate,
     current_user: UserToken = Depends(get_current_user),
@@ -21,6 +41,7 @@ async def create_task(
             title=task_data.title,
             description=task_data.description,
             author_id=current_user.user_id,
+            company_id=current_user.company_id,
             responsible_id=task_data.responsible_id,
             observer_ids=task_data.observer_ids,
             executor_ids=task_data.executor_ids,
@@ -32,7 +53,86 @@ async def create_task(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/tasks/{task_id}")
+@router.post("/tasks/bulk", response_model=TaskBulkResult)
+async def bulk_create_tasks(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=5000),
+    current_user: UserToken = Depends(get_current_user),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    body = await request.body()
+    try:
+        items, errors = parse_bulk_tasks(
+            body.decode("utf-8-sig"),
+            request.headers.get("content-type", "application/json"),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    service = TaskService(uow)
+    return await service.bulk_create_tasks(
+        items,
+        author_id=current_user.user_id,
+        company_id=current_user.company_id,
+        chunk_size=chunk_size,
+        errors=errors,
+    )
+
+
+@router.post("/tasks/bulk-status", response_model=TaskStatusBulkResult)
+async def bulk_update_status(
+    data: TaskStatusBulkUpdate,
+    current_user: UserToken = Depends(get_current_user),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    service = TaskService(uow)
+    try:
+        return await service.bulk_update_status(current_user.company_id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/tasks/overdue-count")
+async def count_overdue_tasks(
+    current_user: UserToken = Depends(get_current_user),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    service = TaskService(uow)
+    return {"count": await service.count_overdue(current_user.company_id)}
+
+
+@router.get("/tasks", response_model=TaskPage)
+async def list_tasks(
+    responsible_id: Optional[int] = None,
+    executor_id: Optional[int] = None,
+    observer_id: Optional[int] = None,
+    author_id: Optional[int] = None,
+    status: Optional[TaskStatus] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    overdue: bool = False,
+    after: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: UserToken = Depends(get_current_user),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    service = TaskService(uow)
+    return await service.list_tasks(
+        company_id=current_user.company_id,
+        responsible_id=responsible_id,
+        executor_id=executor_id,
+        observer_id=observer_id,
+        author_id=author_id,
+        status=status,
+        deadline_from=deadline_from,
+        deadline_to=deadline_to,
+        overdue=overdue,
+        after=after,
+        limit=limit,
+    )
+
+
+@router.get("/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
     current_user: UserToken = Depends(get_current_user),
@@ -40,12 +140,12 @@ async def get_task(
 ):
     service = TaskService(uow)
     try:
-        return await service.get_task(task_id)
+        return await service.get_task(task_id, current_user.company_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.put("/tasks/{task_id}")
+@router.put("/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: int,
     updates: TaskUpdate,
@@ -54,7 +154,9 @@ async def update_task(
 ):
     service = TaskService(uow)
     try:
-        return await service.update_task(task_id, updates.dict(exclude_unset=True))
+        return await service.update_task(
+            task_id, current_user.company_id, updates.dict(exclude_unset=True)
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -67,7 +169,39 @@ async def delete_task(
 ):
     service = TaskService(uow)
     try:
-        await service.delete_task(task_id)
+        await service.delete_task(task_id, current_user.company_id)
         return {"detail": "Task deleted"}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/stream")
+async def stream_task_events(
+    request: Request,
+    current_user: UserToken = Depends(get_current_user),
+):
+    queue = await task_events.subscribe(current_user.user_id)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is OVERFLOW:
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                if event.get("company_id") != current_user.company_id:
+                    continue
+                data = {key: event[key] for key in ("event", "id", "company_id")}
+                yield f"event: task.{event['event']}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            task_events.unsubscribe(current_user.user_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,56 @@
+import logging
+from datetime import datetime
 from typing import List, Optional
 
+from sqlalchemy.exc import SQLAlchemyError
+
 from models.models import TaskStatus
+from schemas.schemas import (
+    TaskBulkCreated,
+    TaskBulkError,
+    TaskBulkResult,
+    TaskCreate,
+    TaskPage,
+    TaskResponse,
+    TaskStatusBulkResult,
+    TaskStatusBulkUpdate,
+    TaskStatusChange,
+)
 from utils.service import BaseService
+from utils.task_events import build_payloads
 from utils.unit_of_work import UnitOfWork
 
+# Allowed status changes, target -> current statuses it can be reached from.
+STATUS_TRANSITIONS = {
+    TaskStatus.NEW: [TaskStatus.IN_PROGRESS, TaskStatus.CANCELED],
+    TaskStatus.IN_PROGRESS: [TaskStatus.NEW, TaskStatus.DONE],
+    TaskStatus.DONE: [TaskStatus.NEW, TaskStatus.IN_PROGRESS],
+    TaskStatus.CANCELED: [TaskStatus.NEW, TaskStatus.IN_PROGRESS],
+}
+
+# Upper bound on explicit ids in one bulk status change.
+MAX_BULK_STATUS_IDS = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _missing_participants(
+    existing: set[int],
+    responsible_id: int,
+    observer_ids: List[int],
+    executor_ids: List[int],
+) -> list[str]:
+    return [
+        f"{role} with ID {user_id} not found"
+        for role, ids in (
+            ("Responsible", [responsible_id]),
+            ("Observer", observer_ids),
+            ("Executor", executor_ids),
+        )
+        for user_id in ids
+        if user_id not in existing
+    ]
+
 
 class TaskService(BaseService):
     def __init__(self, uow: UnitOfWork):
@@ -14,69 +61,271 @@ class TaskService(BaseService):
         title: str,
         description: Optional[str],
         author_id: int,
+        company_id: int,
         responsible_id: int,
         observer_ids: List[int],
         executor_ids: List[int],
-        deadline: Optional[str],
+        deadline: Optional[datetime],
         estimated_time: Optional[float],
         status: Optional[str] = TaskStatus.NEW.value,
     ):
-        print(f"Received status: {status}")
+        if status not in TaskStatus._value2member_map_:
+            raise ValueError(f"Invalid status: {status}")
+
+        async with self.uow:
+            existing = await self.uow.user.get_existing_ids(
+                company_id, list({responsible_id, *observer_ids, *executor_ids})
+            )
+            missing = _missing_participants(
+                existing, responsible_id, observer_ids, executor_ids
+            )
+            if missing:
+                raise ValueError("; ".join(missing))
+
+            [task_id] = await self.uow.task.add_many(
+                [
+                    {
+                        "title": title,
+                        "description": description,
+                        "author_id": author_id,
+                        "company_id": company_id,
+                        "responsible_id": responsible_id,
+                        "deadline": deadline,
+                        "estimated_time": estimated_time,
+                        "status": TaskStatus(status),
+                    }
+                ]
+            )
+            await self.uow.task.add_participants(task_id, observer_ids, executor_ids)
+            await self._notify("created", company_id, [task_id])
+
+            row = await self.uow.task.get_row(task_id, company_id)
+            await self.uow.commit()
+            return TaskResponse.model_validate(row)
+
+    async def bulk_create_tasks(
+        self,
+        items: list[tuple[int, TaskCreate]],
+        author_id: int,
+        company_id: int,
+        chunk_size: int = 500,
+        errors: Optional[list[TaskBulkError]] = None,
+    ) -> TaskBulkResult:
+        """Create many tasks; ``items`` are (index, TaskCreate) pairs.
+
+        Every referenced user is checked with one query up front and items
+        with unknown users are reported instead of inserted. The rest are
+        written chunk by chunk, each chunk in its own transaction, so a
+        failing chunk is reported per item without undoing earlier ones.
+        """
+        errors = list(errors or [])
+        created: list[TaskBulkCreated] = []
+
         async with self.uow:
-            task_id = await self.uow.task.add_one_and_get_id(
-                title=title,
-                description=description,
-                author_id=author_id,
-                responsible_id=responsible_id,
-                deadline=deadline,
-                estimated_time=estimated_time,
-                status=status,
+            user_ids = {
+                user_id
+                for _, item in items
+                for user_id in (
+                    item.responsible_id,
+                    *item.observer_ids,
+                    *item.executor_ids,
+                )
+            }
+            existing = await self.uow.user.get_existing_ids(company_id, list(user_ids))
+
+            valid: list[tuple[int, TaskCreate]] = []
+            for index, item in items:
+                missing = _missing_participants(
+                    existing, item.responsible_id, item.observer_ids, item.executor_ids
+                )
+                if missing:
+                    errors.append(TaskBulkError(index=index, detail="; ".join(missing)))
+                else:
+                    valid.append((index, item))
+
+            for start in range(0, len(valid), chunk_size):
+                chunk = valid[start:start + chunk_size]
+                try:
+                    task_ids = await self.uow.task.add_many(
+                        [
+                            {
+                                "title": item.title,
+                                "description": item.description,
+                                "author_id": author_id,
+                                "company_id": company_id,
+                                "responsible_id": item.responsible_id,
+                                "deadline": item.deadline,
+                                "estimated_time": item.estimated_time,
+                                "status": item.status or TaskStatus.NEW,
+                            }
+                            for _, item in chunk
+                        ]
+                    )
+                    await self.uow.task.add_participants_many(
+                        [
+                            (task_id, user_id)
+                            for task_id, (_, item) in zip(task_ids, chunk)
+                            for user_id in item.observer_ids
+                        ],
+                        [
+                            (task_id, user_id)
+                            for task_id, (_, item) in zip(task_ids, chunk)
+                            for user_id in item.executor_ids
+                        ],
+                    )
+                    await self._notify("created", company_id, task_ids)
+                    await self.uow.commit()
+                except SQLAlchemyError:
+                    logger.exception(
+                        "Bulk task insert failed for items %d-%d",
+                        chunk[0][0],
+                        chunk[-1][0],
+                    )
+                    await self.uow.rollback()
+                    errors.extend(
+                        TaskBulkError(index=index, detail="Insert failed")
+                        for index, _ in chunk
+                    )
+                    continue
+                created.extend(
+                    TaskBulkCreated(index=index, id=task_id)
+                    for task_id, (index, _) in zip(task_ids, chunk)
+                )
+
+        errors.sort(key=lambda error: error.index)
+        return TaskBulkResult(created=created, errors=errors)
+
+    async def bulk_update_status(
+        self, company_id: int, data: TaskStatusBulkUpdate
+    ) -> TaskStatusBulkResult:
+        """Apply one status change to tasks picked by id list or by filter.
+
+        The transition check runs inside the UPDATE, so tasks whose current
+        status cannot reach the target are left untouched. For id lists they
+        are reported as ``rejected`` (with their current status) or
+        ``not_found``.
+        """
+        if (data.ids is None) == (data.filter is None):
+            raise ValueError("Provide either ids or filter")
+        if data.ids is not None and len(data.ids) > MAX_BULK_STATUS_IDS:
+            raise ValueError(f"At most {MAX_BULK_STATUS_IDS} ids per request")
+        filters = None
+        if data.filter is not None:
+            # overdue=False narrows nothing, so it does not count as a condition.
+            filters = {
+                key: value
+                for key, value in data.filter.model_dump(exclude_none=True).items()
+                if not (key == "overdue" and value is False)
+            }
+            if not filters:
+                raise ValueError("Filter must set at least one field")
+
+        values = data.model_dump(
+            include={"deadline", "estimated_time"}, exclude_unset=True
+        )
+        async with self.uow:
+            rows = await self.uow.task.transition_status(
+                company_id,
+                data.status,
+                STATUS_TRANSITIONS[data.status],
+                ids=data.ids,
+                filters=filters,
+                **values,
+            )
+            updated = [TaskStatusChange(id=row.id, status=row.status) for row in rows]
+            # A status change never touches participants, so reading the
+            # followers after the UPDATE gives the same recipients.
+            await self._notify(
+                "updated", company_id, [change.id for change in updated]
             )
 
-            observers = []
-            for id in observer_ids:
-                user = await self.uow.user.get_by_id(id)
-                if not user:
-                    raise ValueError(f"Observer with ID {id} not found")
-                observers.append(user)
-
-            executors = []
-            for id in executor_ids:
-                user = await self.uow.user.get_by_id(id)
-                if not user:
-                    raise ValueError(f"Executor with ID {id} not found")
-                executors.append(user)
-            if status not in TaskStatus._value2member_map_:
-                raise ValueError(f"Invalid status: {status}")
-
-            task = await self.uow.task.get_by_id(task_id)
-            task.observers = observers
-            task.executors = executors
-            print(f"Received status: {status}")
+            rejected: list[TaskStatusChange] = []
+            not_found: list[int] = []
+            if data.ids is not None:
+                updated_ids = {change.id for change in updated}
+                remaining = [id for id in dict.fromkeys(data.ids) if id not in updated_ids]
+                if remaining:
+                    statuses = await self.uow.task.get_statuses(company_id, remaining)
+                    for id in remaining:
+                        if id in statuses:
+                            rejected.append(TaskStatusChange(id=id, status=statuses[id]))
+                        else:
+                            not_found.append(id)
             await self.uow.commit()
-            return task
 
-    async def get_task(self, task_id: int):
+        return TaskStatusBulkResult(
+            updated=updated, rejected=rejected, not_found=not_found
+        )
+
+    async def list_tasks(
+        self,
+        company_id: int,
+        limit: int = 50,
+        **filters,
+    ) -> TaskPage:
         async with self.uow:
-            task = await self.uow.task.get_by_id(task_id)
-            if not task:
+            rows = await self.uow.task.get_page(
+                company_id, limit=limit + 1, **filters
+            )
+        items = [TaskResponse.model_validate(row) for row in rows[:limit]]
+        next_cursor = items[-1].id if len(rows) > limit else None
+        return TaskPage(items=items, next_cursor=next_cursor)
+
+    async def count_overdue(self, company_id: int) -> int:
+        async with self.uow:
+            return await self.uow.task.count_overdue(company_id)
+
+    async def get_task(self, task_id: int, company_id: int) -> TaskResponse:
+        async with self.uow:
+            row = await self.uow.task.get_row(task_id, company_id)
+            if row is None:
                 raise ValueError("Task not found")
-            return task
+            return TaskResponse.model_validate(row)
+
+    async def update_task(
+        self, task_id: int, company_id: int, updates: dict
+    ) -> TaskResponse:
+        if (
+            updates.get("status") is not None
+            and updates["status"] not in TaskStatus._value2member_map_
+        ):
+            raise ValueError(f"Invalid status: {updates['status']}")
 
-    async def update_task(self, task_id: int, updates: dict):
         async with self.uow:
-            task = await self.uow.task.update_one_by_id(task_id, **updates)
-            if not task:
+            if updates:
+                before = await self.uow.task.get_followers(company_id, [task_id])
+                updated_id = await self.uow.task.update_fields(
+                    task_id, company_id, **updates
+                )
+                if updated_id is None:
+                    raise ValueError("Task not found")
+                await self._notify("updated", company_id, [task_id], before)
+            row = await self.uow.task.get_row(task_id, company_id)
+            if row is None:
                 raise ValueError("Task not found")
-            if (
-                "status" in updates
-                and updates["status"] not in TaskStatus._value2member_map_
-            ):
-                raise ValueError(f"Invalid status: {updates['status']}")
             await self.uow.commit()
-            return task
+            return TaskResponse.model_validate(row)
 
-    async def delete_task(self, task_id: int):
+    async def delete_task(self, task_id: int, company_id: int):
         async with self.uow:
+            before = await self.uow.task.get_followers(company_id, [task_id])
+            if task_id not in before:
+                raise ValueError("Task not found")
+            await self._notify("deleted", company_id, [], before)
             await self.uow.task.delete_one_by_id(task_id)
             await self.uow.commit()
+
+    async def _notify(
+        self,
+        event: str,
+        company_id: int,
+        task_ids: list[int],
+        before: Optional[dict[int, set[int]]] = None,
+    ) -> None:
+        """Emit ``event`` to everyone following the tasks now, plus anyone
+        in ``before`` (followers read ahead of the write), so users dropped
+        from a task or following a deleted one still hear about it."""
+        followers = await self.uow.task.get_followers(company_id, task_ids)
+        for task_id, user_ids in (before or {}).items():
+            followers.setdefault(task_id, set()).update(user_ids)
+        await self.uow.task.notify(build_payloads(event, company_id, followers))
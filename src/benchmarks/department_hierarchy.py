@@ -0,0 +1,212 @@
+"""Benchmark department hierarchy operations against a real database.
+
+Builds a synthetic company tree with the given depth and fan-out, times
+the DepartmentRepository hierarchy operations on it and prints a report.
+The benchmark company and its departments are removed afterwards.
+
+Run from the ``src`` directory:
+
+    python -m benchmarks.department_hierarchy --depth 6 --fanout 4
+    python -m benchmarks.department_hierarchy --size 50000 --format json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete
+
+from models.models import Company, Department
+from utils.unit_of_work import UnitOfWork
+
+
+def generate_tree(depth: int, fanout: int, size: Optional[int]) -> list[list[int]]:
+    """Return parent positions level by level, breadth first.
+
+    ``levels[d][i]`` is the position (in the previous level) of the parent
+    of the i-th node on level ``d``; the single root has parent -1.
+    """
+    levels = [[-1]]
+    total = 1
+    for _ in range(1, depth):
+        level = []
+        for parent in range(len(levels[-1])):
+            for _ in range(fanout):
+                if size is not None and total >= size:
+                    break
+                level.append(parent)
+                total += 1
+        if not level:
+            break
+        levels.append(level)
+    return levels
+
+
+async def populate(
+    uow: UnitOfWork, company_id: int, levels: list[list[int]]
+) -> list[list[int]]:
+    total = sum(len(level) for level in levels)
+    ids = iter(await uow.department.reserve_ids(total))
+
+    level_ids: list[list[int]] = []
+    level_paths: list[list[tuple[str, str]]] = []
+    departments = []
+    for depth, level in enumerate(levels):
+        current_ids, current_paths = [], []
+        for index, parent in enumerate(level):
+            dep_id = next(ids)
+            name = f"d{depth}-{index}"
+            if parent == -1:
+                path, name_path = str(dep_id), name
+            else:
+                parent_path, parent_name_path = level_paths[-1][parent]
+                path = f"{parent_path}.{dep_id}"
+                name_path = f"{parent_name_path}.{name}"
+            current_ids.append(dep_id)
+            current_paths.append((path, name_path))
+            departments.append(
+                {"id": dep_id, "name": name, "path": path, "name_path": name_path}
+            )
+        level_ids.append(current_ids)
+        level_paths.append(current_paths)
+
+    await uow.department.add_many(company_id, departments)
+    return level_ids
+
+
+async def measure(
+    timings: dict[str, list[float]],
+    name: str,
+    operation: Callable[[], Awaitable[object]],
+) -> None:
+    started = time.perf_counter()
+    await operation()
+    timings.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+
+
+def summarize(timings: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+    report = {}
+    for name, samples in timings.items():
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        report[name] = {
+            "runs": len(ordered),
+            "min_ms": round(ordered[0], 3),
+            "median_ms": round(statistics.median(ordered), 3),
+            "p95_ms": round(p95, 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+    return report
+
+
+async def run(depth: int, fanout: int, size: Optional[int], repeat: int) -> dict:
+    levels = generate_tree(depth, fanout, size)
+    timings: dict[str, list[float]] = {}
+
+    uow = UnitOfWork()
+    async with uow:
+        company_id = await uow.company.add_one_and_get_id(
+            name=f"benchmark-{uuid.uuid4().hex}"
+        )
+        try:
+            started = time.perf_counter()
+            level_ids = await populate(uow, company_id, levels)
+            timings["populate"] = [(time.perf_counter() - started) * 1000]
+
+            root = level_ids[0][0]
+            middle = level_ids[len(level_ids) // 2][0]
+            leaf = level_ids[-1][-1]
+
+            reads = {
+                "descendants(root)": lambda: uow.department.get_descendants(root),
+                "descendants(middle)": lambda: uow.department.get_descendants(middle),
+                "ancestors(leaf)": lambda: uow.department.get_ancestors(leaf),
+                "descendants_with_names(middle)": (
+                    lambda: uow.department.get_descendants_with_names(middle)
+                ),
+                "visualized_path(leaf)": (
+                    lambda: uow.department.get_visualized_path(leaf)
+                ),
+            }
+            for _ in range(repeat):
+                for name, operation in reads.items():
+                    await measure(timings, name, operation)
+
+            if len(level_ids) > 2:
+                moved = level_ids[2][0]
+                home = await uow.department.get_by_id(level_ids[1][0])
+                target = await uow.department.get_by_id(level_ids[1][-1])
+                home_path, home_name_path = str(home.path), home.name_path
+                target_path, target_name_path = str(target.path), target.name_path
+                for _ in range(repeat):
+                    await measure(
+                        timings,
+                        "move(subtree)",
+                        lambda: uow.department.move_department_with_descendants(
+                            moved, target_path, target_name_path
+                        ),
+                    )
+                    await uow.department.move_department_with_descendants(
+                        moved, home_path, home_name_path
+                    )
+
+            deletable = level_ids[-2] if len(level_ids) > 1 else []
+            for dep_id in deletable[:repeat]:
+                await measure(
+                    timings,
+                    "delete(subtree)",
+                    lambda dep_id=dep_id: uow.department.delete_by_query(dep_id),
+                )
+        finally:
+            await uow.session.execute(
+                delete(Department).where(Department.company_id == company_id)
+            )
+            await uow.session.execute(delete(Company).where(Company.id == company_id))
+            await uow.session.commit()
+
+    return {
+        "tree": {
+            "depth": len(levels),
+            "fanout": fanout,
+            "departments": sum(len(level) for level in levels),
+        },
+        "operations": summarize(timings),
+    }
+
+
+def print_report(report: dict) -> None:
+    tree = report["tree"]
+    print(
+        f"departments={tree['departments']} depth={tree['depth']} "
+        f"fanout={tree['fanout']}"
+    )
+    print(f"{'operation':<32}{'runs':>6}{'min':>10}{'median':>10}{'p95':>10}{'max':>10}")
+    for name, stats in report["operations"].items():
+        print(
+            f"{name:<32}{stats['runs']:>6}{stats['min_ms']:>10}"
+            f"{stats['median_ms']:>10}{stats['p95_ms']:>10}{stats['max_ms']:>10}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--size", type=int, default=None, help="cap on departments")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.depth, args.fanout, args.size, args.repeat))
+    if args.format == "json":
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
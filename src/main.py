@@ -6,12 +6,16 @@ from fastapi import FastAPI
 from api.v1.auth.routers import router
 from api.v1.department.routers import router as d_router
 from api.v1.tasks.routers import router as t_router
+from database.db import engine
 from utils.jwt import auth_middleware
+from utils.task_events import task_events
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await task_events.start(engine)
     yield
+    await task_events.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -1,10 +1,11 @@
+from datetime import datetime
 from enum import Enum
 from typing import Optional
 
 from sqlalchemy import Boolean, Column
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy import (
-    Float, ForeignKey, Integer,
+    DateTime, Float, ForeignKey, Index, Integer,
     String, Table, UniqueConstraint
 )
 from sqlalchemy.orm import declarative_base
@@ -16,6 +17,28 @@ Base = declarative_base()
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_manager_path_gist", "manager_path", postgresql_using="gist"),
+        Index(
+            "ix_users_first_name_trgm",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_last_name_trgm",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index("ix_users_directory", "company_id", "last_name", "first_name", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String, unique=True, index=True)
@@ -40,6 +63,7 @@ class User(Base):
     manager_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("users.id"), nullable=True
     )
+    manager_path: Mapped[Optional[str]] = mapped_column(LtreeType, nullable=True)
     manager: Mapped[Optional["User"]] = relationship(
         "User", remote_side="User.id", back_populates="subordinates"
     )
@@ -64,6 +88,15 @@ class Company(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, unique=True, index=True)
+    department_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    manager_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    role_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     employees: Mapped[list["User"]] = relationship("User", back_populates="company")
     departments: Mapped[list["Department"]] = relationship(
         "Department", back_populates="company"
@@ -95,10 +128,21 @@ class Invite(Base):
 
 class Department(Base):
     __tablename__ = "departments"
+    __table_args__ = (
+        Index("ix_departments_path_gist", "path", postgresql_using="gist"),
+        Index(
+            "ix_departments_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index("ix_departments_company_id", "company_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     path: Mapped[str] = mapped_column(LtreeType, index=True, nullable=True)
+    name_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))
     manager_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("users.id"), nullable=True
@@ -117,6 +161,11 @@ class Department(Base):
 
 class RoleAssignment(Base):
     __tablename__ = "role_assignments"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "department_id", "role_name", name="unique_role_assignment"
+        ),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     department_id: Mapped[int] = mapped_column(
@@ -137,10 +186,22 @@ class TaskStatus(str, Enum):
     CANCELED = "Canceled"
 
 
+OPEN_TASK_STATUSES = (TaskStatus.NEW, TaskStatus.IN_PROGRESS)
+
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_company_responsible", "company_id", "responsible_id", "id"),
+        Index("ix_tasks_company_author", "company_id", "author_id", "id"),
+        Index("ix_tasks_company_status", "company_id", "status", "id"),
+        Index("ix_tasks_status_deadline", "status", "deadline"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), nullable=False
+    )
     title: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -157,7 +218,9 @@ class Task(Base):
         back_populates="assigned_tasks",
         lazy="joined",
     )
-    deadline: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    deadline: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     status: Mapped[str] = mapped_column(
         SQLAlchemyEnum(TaskStatus), default=TaskStatus.NEW.value
     )
@@ -169,6 +232,7 @@ task_observers = Table(
     Base.metadata,
     Column("task_id", ForeignKey("tasks.id"), primary_key=True),
     Column("user_id", ForeignKey("users.id"), primary_key=True),
+    Index("ix_task_observers_user_task", "user_id", "task_id"),
 )
 
 task_executors = Table(
@@ -176,4 +240,5 @@ task_executors = Table(
     Base.metadata,
     Column("task_id", ForeignKey("tasks.id"), primary_key=True),
     Column("user_id", ForeignKey("users.id"), primary_key=True),
+    Index("ix_task_executors_user_task", "user_id", "task_id"),
 )
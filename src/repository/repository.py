@@ -1,53 +1,341 @@
 import logging
-from typing import Any, List, Optional
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
 
 from fastapi import HTTPException
-from sqlalchemy import delete, select, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    Integer,
+    Select,
+    Table,
+    any_,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
 from sqlalchemy_utils.types.ltree import Ltree
 
 from models.models import (
+    OPEN_TASK_STATUSES,
     Company,
     Department,
     Invite,
     Position,
     RoleAssignment,
     Task,
+    TaskStatus,
     User,
+    task_executors,
+    task_observers,
 )
 from utils.core_repository import SQLAlchemyBaseRepository
+from utils.task_events import TASK_EVENTS_CHANNEL
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class UserRepository(SQLAlchemyBaseRepository):
     def __init__(self, session):
         super().__init__(session, User)
 
-    async def get_all_subordinates(self, user_id: int) -> list:
+    async def add_one(self, **kwargs) -> None:
         result = await self.session.execute(
-            select(User)
-            .options(selectinload(User.subordinates))
-            .where(User.id == user_id)
+            text("SELECT nextval(pg_get_serial_sequence('users', 'id'))")
         )
-        user = result.scalar_one_or_none()
+        user_id = result.scalar_one()
 
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found.")
+        manager_path = str(user_id)
+        if kwargs.get("manager_id") is not None:
+            parent_path = await self.get_manager_path(kwargs["manager_id"])
+            if parent_path is None:
+                raise ValueError(f"Invalid manager_id: {kwargs['manager_id']}")
+            manager_path = f"{parent_path}.{user_id}"
+
+        await super().add_one(id=user_id, manager_path=Ltree(manager_path), **kwargs)
+
+    async def get_by_ids(self, user_ids: Iterable[int]) -> list:
+        result = await self.session.execute(
+            select(
+                User.id,
+                User.email,
+                User.first_name,
+                User.last_name,
+                User.is_active,
+                User.company_id,
+                User.manager_id,
+                User.department_id,
+                User.position_id,
+            ).where(User.id == any_(literal(list(user_ids), ARRAY(Integer))))
+        )
+        return result.all()
+
+    async def get_existing_ids(self, company_id: int, user_ids: list[int]) -> set[int]:
+        result = await self.session.execute(
+            select(User.id).where(
+                User.company_id == company_id,
+                User.id == any_(literal(user_ids, ARRAY(Integer))),
+            )
+        )
+        return set(result.scalars().all())
+
+    async def get_manager_path(self, user_id: int) -> Optional[str]:
+        result = await self.session.execute(
+            select(User.manager_path).where(User.id == user_id)
+        )
+        path = result.scalar_one_or_none()
+        return str(path) if path is not None else None
+
+    async def set_manager(self, user_id: int, manager_id: Optional[int]) -> int:
+        result = await self.session.execute(
+            select(User.manager_path, User.company_id).where(User.id == user_id)
+        )
+        user = result.first()
+        if user is None or user.manager_path is None:
+            raise ValueError("User not found")
+        old_path = str(user.manager_path)
+
+        new_prefix = None
+        if manager_id is not None:
+            new_prefix = await self.get_manager_path(manager_id)
+            if new_prefix is None:
+                raise ValueError("Manager not found")
+            if new_prefix == old_path or new_prefix.startswith(f"{old_path}."):
+                raise ValueError("Manager cannot be one of the user's subordinates")
+
+        params = {"user_id": user_id, "manager_id": manager_id, "old_path": old_path}
+        new_path = "subpath(manager_path, nlevel(CAST(:old_path AS ltree)) - 1)"
+        if new_prefix is not None:
+            new_path = f"CAST(:new_prefix AS ltree) || {new_path}"
+            params["new_prefix"] = new_prefix
+
+        result = await self.session.execute(
+            text(f"""
+            UPDATE users
+            SET manager_id = CASE
+                    WHEN id = :user_id THEN CAST(:manager_id AS integer)
+                    ELSE manager_id
+                END,
+                manager_path = {new_path}
+            WHERE manager_path <@ CAST(:old_path AS ltree)
+            """),
+            params,
+        )
+        await self.bump_version(user.company_id)
+        await self.session.commit()
+        return result.rowcount
+
+    async def update_one_by_id(self, obj_id: int, **kwargs) -> Optional[Any]:
+        obj = await self.session.get(self.model, obj_id)
+        if obj:
+            for key, value in kwargs.items():
+                setattr(obj, key, value)
+            await self.bump_version(obj.company_id)
+            await self.session.commit()
+            await self.session.refresh(obj)
+        return obj
+
+    async def bump_version(self, company_id: int) -> None:
+        await self.session.execute(
+            update(Company)
+            .where(Company.id == company_id)
+            .values(manager_version=Company.manager_version + 1)
+        )
+
+    async def get_version(self, company_id: int) -> int:
+        result = await self.session.execute(
+            select(Company.manager_version).where(Company.id == company_id)
+        )
+        return result.scalar_one_or_none() or 0
 
-        def collect_subordinates(user):
-            all_subordinates = []
-            for subordinate in user.subordinates:
-                all_subordinates.append(subordinate)
-                all_subordinates.extend(collect_subordinates(subordinate))
-            return all_subordinates
+    async def search_directory(
+        self,
+        company_id: int,
+        q: Optional[str] = None,
+        department_id: Optional[int] = None,
+        position_id: Optional[int] = None,
+        after: Optional[list] = None,
+        limit: int = 50,
+    ) -> list:
+        query = select(
+            User.id,
+            User.email,
+            User.first_name,
+            User.last_name,
+            User.is_active,
+            User.manager_id,
+            User.department_id,
+            User.position_id,
+        ).where(User.company_id == company_id)
 
-        all_subordinates = collect_subordinates(user)
-        return [sub.dict() for sub in all_subordinates]
+        for word in (q or "").split():
+            pattern = f"%{escape_like(word)}%"
+            query = query.where(
+                User.first_name.ilike(pattern, escape="\\")
+                | User.last_name.ilike(pattern, escape="\\")
+                | User.email.ilike(pattern, escape="\\")
+            )
+
+        if department_id is not None:
+            root_path = (
+                select(Department.path)
+                .where(
+                    Department.id == department_id,
+                    Department.company_id == company_id,
+                )
+                .scalar_subquery()
+            )
+            query = query.where(
+                User.department_id.in_(
+                    select(Department.id).where(Department.path.op("<@")(root_path))
+                )
+            )
+        if position_id is not None:
+            query = query.where(User.position_id == position_id)
+        if after is not None:
+            query = query.where(
+                tuple_(User.last_name, User.first_name, User.id) > tuple_(*after)
+            )
+
+        result = await self.session.execute(
+            query.order_by(User.last_name, User.first_name, User.id).limit(limit)
+        )
+        return result.all()
+
+    async def get_span_of_control(self, company_id: int) -> list:
+        manager = aliased(User)
+        report = aliased(User)
+        levels_below = func.nlevel(report.manager_path) - func.nlevel(manager.manager_path)
+
+        result = await self.session.execute(
+            select(
+                manager.id,
+                manager.first_name,
+                manager.last_name,
+                manager.department_id,
+                func.count().filter(report.manager_id == manager.id).label("direct_reports"),
+                func.count().label("total_reports"),
+                func.max(levels_below).label("depth"),
+            )
+            .join(
+                report,
+                report.manager_path.op("<@")(manager.manager_path)
+                & (report.id != manager.id),
+            )
+            .where(manager.company_id == company_id)
+            .group_by(manager.id)
+            .order_by(manager.id)
+        )
+        return result.all()
+
+    async def get_manager_chains(self, company_id: int, user_ids: list[int]) -> list:
+        user = aliased(User)
+        manager = aliased(User)
+        result = await self.session.execute(
+            select(
+                user.id.label("user_id"),
+                manager.id,
+                manager.first_name,
+                manager.last_name,
+                manager.email,
+                manager.position_id,
+                manager.department_id,
+            )
+            .outerjoin(
+                manager,
+                manager.manager_path.op("@>")(user.manager_path)
+                & (manager.id != user.id),
+            )
+            .where(user.company_id == company_id, user.id.in_(user_ids))
+            .order_by(user.id, func.nlevel(manager.manager_path).desc())
+        )
+        return result.all()
+
+    async def is_in_reporting_line(self, user_id: int, manager_id: int) -> bool:
+        subordinate = aliased(User)
+        manager = aliased(User)
+        result = await self.session.execute(
+            select(subordinate.id).where(
+                subordinate.id == user_id,
+                manager.id == manager_id,
+                subordinate.id != manager.id,
+                subordinate.manager_path.op("<@")(manager.manager_path),
+            )
+        )
+        return result.first() is not None
+
+    async def get_all_subordinates(
+        self,
+        user_id: int,
+        max_depth: Optional[int] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list:
+        result = await self.session.execute(
+            text("""
+            SELECT u.id, u.email, u.first_name, u.last_name, u.is_active,
+                   u.manager_id, u.department_id, u.position_id,
+                   nlevel(u.manager_path) - nlevel(b.manager_path) AS depth
+            FROM users AS b
+            JOIN users AS u ON u.manager_path <@ b.manager_path AND u.id <> b.id
+            WHERE b.id = :user_id
+              AND (
+                  CAST(:max_depth AS integer) IS NULL
+                  OR nlevel(u.manager_path) - nlevel(b.manager_path) <= :max_depth
+              )
+              AND (CAST(:after AS integer) IS NULL OR u.id > :after)
+            ORDER BY u.id
+            LIMIT :limit
+            """),
+            {
+                "user_id": user_id,
+                "max_depth": max_depth,
+                "after": after,
+                "limit": limit,
+            },
+        )
+        rows = result.all()
+
+        if not rows and after is None and await self.get_manager_path(user_id) is None:
+            raise HTTPException(status_code=404, detail="User not found.")
+        return rows
 
 
 class CompanyRepository(SQLAlchemyBaseRepository):
     def __init__(self, session):
         super().__init__(session, Company)
 
+    async def get_versions(self, company_id: int) -> Optional[Any]:
+        result = await self.session.execute(
+            select(
+                Company.department_version,
+                Company.manager_version,
+                Company.role_version,
+            ).where(Company.id == company_id)
+        )
+        return result.first()
+
+    async def lock_versions(self, company_id: int) -> Optional[Any]:
+        """Like ``get_versions`` but holds the company row lock until the
+        transaction ends, serializing writers that plan against a snapshot."""
+        result = await self.session.execute(
+            select(
+                Company.department_version,
+                Company.manager_version,
+                Company.role_version,
+            )
+            .where(Company.id == company_id)
+            .with_for_update()
+        )
+        return result.first()
+
 
 class PositionRepository(SQLAlchemyBaseRepository):
     def __init__(self, session):
@@ -85,14 +373,40 @@ class DepartmentRepository(SQLAlchemyBaseRepository):
                 raise ValueError("Parent path is not set")
 
             department.path = Ltree(f"{parent.path}.{department.id}")
+            department.name_path = f"{parent.name_path}.{name}"
         else:
             department.path = Ltree(f"{department.id}")
+            department.name_path = name
 
         self.session.add(department)
+        await self.bump_version(company_id)
         await self.session.commit()
 
         return department.id
 
+    async def reserve_ids(self, count: int) -> list[int]:
+        result = await self.session.execute(
+            text("""
+            SELECT nextval(pg_get_serial_sequence('departments', 'id'))
+            FROM generate_series(1, :count)
+            """),
+            {"count": count},
+        )
+        return list(result.scalars().all())
+
+    async def add_many(self, company_id: int, departments: list[dict]) -> None:
+        if not departments:
+            return
+        await self.session.execute(
+            insert(self.model),
+            [
+                {**department, "company_id": company_id, "path": Ltree(department["path"])}
+                for department in departments
+            ],
+        )
+        await self.bump_version(company_id)
+        await self.session.commit()
+
     async def get_descendants(self, department_id: int) -> list:
         department = await self.get_by_id(department_id)
         if not department:
@@ -111,65 +425,278 @@ class DepartmentRepository(SQLAlchemyBaseRepository):
         return result.scalars().all()
 
     async def get_descendants_with_names(self, department_id: int) -> list[str]:
-        descendants = await self.get_descendants(department_id)
-
-        result = []
-        for dep in descendants:
-            visualized_path = await self.get_visualized_path(dep.id)
-            result.append(visualized_path)
+        department = await self.get_by_id(department_id)
+        if not department:
+            raise ValueError("Department not found")
 
-        return result
+        query = (
+            select(self.model.name_path)
+            .where(self.model.path.op("<@")(department.path))
+            .order_by(self.model.path)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
 
     async def get_ancestors_with_names(self, department_id: int) -> list[str]:
-        ancestors = await self.get_ancestors(department_id)
-
-        result = []
-        for dep in ancestors:
-            visualized_path = await self.get_visualized_path(dep.id)
-            result.append(visualized_path)
+        department = await self.get_by_id(department_id)
+        if not department:
+            raise ValueError("Department not found")
 
-        return result
+        query = (
+            select(self.model.name_path)
+            .where(self.model.path.op("@>")(department.path))
+            .order_by(self.model.path)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
 
-    async def move_department_with_descendants(self, department_id: int, new_parent_path: str):
+    async def move_department_with_descendants(
+        self,
+        department_id: int,
+        new_parent_path: str,
+        new_parent_name_path: str,
+    ):
         department = await self.get_by_id(department_id)
         if not department:
             raise ValueError("Department not found")
 
         old_path = str(department.path)
+        if str(new_parent_path) == old_path or str(new_parent_path).startswith(
+            f"{old_path}."
+        ):
+            raise ValueError("Department cannot be moved into its own subtree")
+
         new_path = f"{new_parent_path}.{department.id}"
+        new_name_path = f"{new_parent_name_path}.{department.name}"
 
-        department.path = Ltree(new_path)
-        self.session.add(department)
+        await self.bump_version(department.company_id)
+        result = await self.session.execute(
+            text("""
+            UPDATE departments
+            SET path = CASE
+                    WHEN path = CAST(:old_path AS ltree) THEN CAST(:new_path AS ltree)
+                    ELSE CAST(:new_path AS ltree)
+                        || subpath(path, nlevel(CAST(:old_path AS ltree)))
+                END,
+                name_path = :new_name_path
+                    || substr(name_path, length(:old_name_path) + 1)
+            WHERE path <@ CAST(:old_path AS ltree)
+            """),
+            {
+                "old_path": old_path,
+                "new_path": new_path,
+                "old_name_path": department.name_path,
+                "new_name_path": new_name_path,
+            },
+        )
+        if result.rowcount == 0:
+            raise ValueError("Department path changed concurrently; retry the move")
+        await self.session.refresh(department)
+
+    async def apply_paths(
+        self, company_id: int, updates: list[tuple[int, str, str]]
+    ) -> int:
+        if not updates:
+            return 0
 
-        descendants = await self.session.execute(
+        ids, paths, name_paths = (list(column) for column in zip(*updates))
+        result = await self.session.execute(
             text("""
-            SELECT id, path::text
-            FROM departments
-            WHERE path <@ :old_path AND path != :old_path
+            UPDATE departments AS d
+            SET path = CAST(v.path AS ltree), name_path = v.name_path
+            FROM unnest(
+                CAST(:ids AS integer[]),
+                CAST(:paths AS text[]),
+                CAST(:name_paths AS text[])
+            ) AS v(id, path, name_path)
+            WHERE d.id = v.id AND d.company_id = :company_id
             """),
-            {"old_path": old_path},
+            {
+                "ids": ids,
+                "paths": paths,
+                "name_paths": name_paths,
+                "company_id": company_id,
+            },
         )
+        await self.bump_version(company_id)
+        return result.rowcount
+
+    async def rename_department(self, department_id: int, name: str):
+        department = await self.get_by_id(department_id)
+        if not department:
+            raise ValueError("Department not found")
 
-        descendants = descendants.fetchall()
+        old_name_path = department.name_path
+        prefix = old_name_path[: len(old_name_path) - len(department.name)]
 
-        for descendant in descendants:
-            descendant_id = descendant.id
-            descendant_old_path = descendant.path
+        await self.session.execute(
+            text("""
+            UPDATE departments
+            SET name = CASE WHEN id = :id THEN :name ELSE name END,
+                name_path = :new_name_path
+                    || substr(name_path, length(:old_name_path) + 1)
+            WHERE path <@ CAST(:path AS ltree)
+            """),
+            {
+                "id": department.id,
+                "name": name,
+                "path": str(department.path),
+                "old_name_path": old_name_path,
+                "new_name_path": f"{prefix}{name}",
+            },
+        )
+        await self.bump_version(department.company_id)
+        await self.session.refresh(department)
+
+    async def update_one_by_id(self, obj_id: int, **kwargs) -> Optional[Any]:
+        obj = await self.session.get(self.model, obj_id)
+        if obj:
+            for key, value in kwargs.items():
+                setattr(obj, key, value)
+            await self.bump_version(obj.company_id)
+            await self.session.commit()
+            await self.session.refresh(obj)
+        return obj
 
-            relative_path = descendant_old_path[len(old_path) + 1:]
+    async def bump_version(self, company_id: int) -> None:
+        await self.session.execute(
+            update(Company)
+            .where(Company.id == company_id)
+            .values(department_version=Company.department_version + 1)
+        )
 
-            descendant_new_path = f"{new_path}.{relative_path}"
+    async def get_version(self, company_id: int) -> int:
+        result = await self.session.execute(
+            select(Company.department_version).where(Company.id == company_id)
+        )
+        return result.scalar_one_or_none() or 0
 
-            await self.session.execute(
-                text("""
-                UPDATE departments
-                SET path = :new_path
-                WHERE id = :id
-                """),
-                {"new_path": descendant_new_path, "id": descendant_id},
+    async def get_existing_ids(self, company_id: int, department_ids: list[int]) -> set[int]:
+        result = await self.session.execute(
+            select(self.model.id).where(
+                self.model.company_id == company_id,
+                self.model.id == any_(literal(department_ids, ARRAY(Integer))),
             )
+        )
+        return set(result.scalars().all())
 
-        await self.session.commit()
+    async def get_tree_rows(self, company_id: int) -> list:
+        result = await self.session.execute(
+            select(self.model.id, self.model.path, self.model.name)
+            .where(self.model.company_id == company_id)
+            .order_by(self.model.path)
+        )
+        return result.all()
+
+    async def get_children(
+        self, department_id: int, after: Optional[int] = None, limit: int = 50
+    ) -> list:
+        parent = await self.get_by_id(department_id)
+        if not parent:
+            raise ValueError("Department not found")
+
+        result = await self.session.execute(
+            text("""
+            SELECT c.id, c.name, c.manager_id, c.name_path
+            FROM departments AS c
+            WHERE c.path <@ CAST(:parent_path AS ltree)
+              AND nlevel(c.path) = nlevel(CAST(:parent_path AS ltree)) + 1
+              AND (CAST(:after AS integer) IS NULL OR c.id > :after)
+            ORDER BY c.id
+            LIMIT :limit
+            """),
+            {"parent_path": str(parent.path), "after": after, "limit": limit},
+        )
+        return result.all()
+
+    async def get_subtree_stats(self, company_id: int) -> list:
+        ancestor = aliased(self.model)
+        member = aliased(self.model)
+
+        user_stats = (
+            select(
+                User.department_id.label("department_id"),
+                func.count().label("headcount"),
+                func.count().filter(User.is_active.is_(True)).label("active_count"),
+            )
+            .where(User.company_id == company_id, User.department_id.isnot(None))
+            .group_by(User.department_id)
+            .subquery()
+        )
+        task_stats = (
+            select(
+                User.department_id.label("department_id"),
+                func.count(Task.id).label("open_tasks"),
+                func.sum(Task.estimated_time).label("estimated_time"),
+            )
+            .join(User, User.id == Task.responsible_id)
+            .where(
+                User.company_id == company_id,
+                User.department_id.isnot(None),
+                Task.status.in_([TaskStatus.NEW, TaskStatus.IN_PROGRESS]),
+            )
+            .group_by(User.department_id)
+            .subquery()
+        )
+
+        query = (
+            select(
+                ancestor.id,
+                ancestor.name_path,
+                func.coalesce(func.sum(user_stats.c.headcount), 0).label("headcount"),
+                func.coalesce(func.sum(user_stats.c.active_count), 0).label(
+                    "active_count"
+                ),
+                func.coalesce(func.sum(task_stats.c.open_tasks), 0).label("open_tasks"),
+                func.coalesce(func.sum(task_stats.c.estimated_time), 0).label(
+                    "estimated_time"
+                ),
+            )
+            .join(member, member.path.op("<@")(ancestor.path))
+            .outerjoin(user_stats, user_stats.c.department_id == member.id)
+            .outerjoin(task_stats, task_stats.c.department_id == member.id)
+            .where(ancestor.company_id == company_id)
+            .group_by(ancestor.id, ancestor.name_path, ancestor.path)
+            .order_by(ancestor.path)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def search_by_name(self, company_id: int, q: str, limit: int = 20) -> list:
+        is_prefix = self.model.name.ilike(f"{escape_like(q)}%", escape="\\")
+        similarity = func.similarity(self.model.name, q)
+
+        result = await self.session.execute(
+            select(
+                self.model.id,
+                self.model.name,
+                self.model.name_path,
+                similarity.label("similarity"),
+            )
+            .where(
+                self.model.company_id == company_id,
+                is_prefix | self.model.name.op("%")(q),
+            )
+            .order_by(is_prefix.desc(), similarity.desc(), self.model.id)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def get_org_chart_rows(self, company_id: int) -> list:
+        result = await self.session.execute(
+            select(
+                self.model.id,
+                self.model.path,
+                self.model.name,
+                User.id.label("manager_id"),
+                User.first_name.label("manager_first_name"),
+                User.last_name.label("manager_last_name"),
+            )
+            .outerjoin(User, User.id == self.model.manager_id)
+            .where(self.model.company_id == company_id)
+            .order_by(self.model.path)
+        )
+        return result.all()
 
     async def get_by_id(self, obj_id: int) -> Optional[Any]:
         obj = await self.session.get(self.model, obj_id)
@@ -179,39 +706,69 @@ class DepartmentRepository(SQLAlchemyBaseRepository):
             logging.error(f"Unexpected object type: {type(obj)}")
         return obj
 
-    async def delete_by_query(self, department_id: int):
+    async def delete_by_query(self, department_id: int, reparent: bool = False) -> dict:
         department = await self.get_by_id(department_id)
         if not department:
             raise ValueError("Department not found")
 
-        query = delete(self.model).where(self.model.path.op("<@")(department.path))
-        await self.session.execute(query)
+        new_department_id = None
+        if reparent:
+            labels = str(department.path).split(".")
+            if len(labels) < 2:
+                raise ValueError("Root department has no parent to reparent to")
+            new_department_id = int(labels[-2])
+
+        subtree = select(self.model.id).where(
+            self.model.path.op("<@")(department.path)
+        )
+        users = await self.session.execute(
+            update(User)
+            .where(User.department_id.in_(subtree))
+            .values(department_id=new_department_id)
+        )
+        roles = await self.session.execute(
+            delete(RoleAssignment).where(RoleAssignment.department_id.in_(subtree))
+        )
+        departments = await self.session.execute(
+            delete(self.model).where(self.model.path.op("<@")(department.path))
+        )
+        # Employees changed department too, and manager chains and the
+        # span-of-control report cache department_id under manager_version.
+        await self.session.execute(
+            update(Company)
+            .where(Company.id == department.company_id)
+            .values(
+                department_version=Company.department_version + 1,
+                manager_version=Company.manager_version + 1,
+            )
+        )
         await self.session.commit()
 
+        return {
+            "departments": departments.rowcount,
+            "employees": users.rowcount,
+            "role_assignments": roles.rowcount,
+        }
+
     async def move_department(self, department_id: int, new_parent_path: str):
-        department = await self.get_by_id(department_id)
-        if not department:
-            raise ValueError("Department not found")
-        department.path = f"{new_parent_path}.{department.name}"
-        self.session.add(department)
-        await self.session.commit()
+        result = await self.session.execute(
+            select(self.model.name_path).where(
+                self.model.path == Ltree(str(new_parent_path))
+            )
+        )
+        new_parent_name_path = result.scalar_one_or_none()
+        if new_parent_name_path is None:
+            raise ValueError("New parent department not found")
+
+        await self.move_department_with_descendants(
+            department_id, new_parent_path, new_parent_name_path
+        )
 
     async def get_visualized_path(self, department_id: int) -> str:
         department = await self.get_by_id(department_id)
         if not department:
             raise ValueError("Department not found")
-        path_str = str(department.path)
-        path_ids = path_str.split(".")
-
-        path_names = []
-        for id in path_ids:
-            dep = await self.get_by_id(int(id))
-            if not dep:
-                raise ValueError(f"Department with ID {id} not found in path {path_str}")
-            if dep:
-                path_names.append(dep.name)
-
-        return ".".join(path_names)
+        return department.name_path
 
 
 class RoleAssignmentRepository(SQLAlchemyBaseRepository):
@@ -225,15 +782,309 @@ class RoleAssignmentRepository(SQLAlchemyBaseRepository):
         return result.scalars().all()
 
     async def add_one(self, user_id: int, department_id: int, role_name: str):
-        new_assignment = RoleAssignment(
-            user_id=user_id,
-            department_id=department_id,
-            role_name=role_name,
+        await self.add_many([(user_id, department_id, role_name)])
+
+    async def add_many(self, assignments: list[tuple[int, int, str]]) -> int:
+        if not assignments:
+            return 0
+        user_ids, department_ids, role_names = (list(c) for c in zip(*assignments))
+        result = await self.session.execute(
+            text("""
+            INSERT INTO role_assignments (user_id, department_id, role_name)
+            SELECT * FROM unnest(
+                CAST(:user_ids AS integer[]),
+                CAST(:department_ids AS integer[]),
+                CAST(:role_names AS varchar[])
+            )
+            ON CONFLICT ON CONSTRAINT unique_role_assignment DO NOTHING
+            """),
+            {
+                "user_ids": user_ids,
+                "department_ids": department_ids,
+                "role_names": role_names,
+            },
         )
-        self.session.add(new_assignment)
+        await self.bump_version_for_departments(list(set(department_ids)))
         await self.session.commit()
+        return result.rowcount
+
+    async def delete_many(self, assignments: list[tuple[int, int, str]]) -> int:
+        if not assignments:
+            return 0
+        user_ids, department_ids, role_names = (list(c) for c in zip(*assignments))
+        result = await self.session.execute(
+            text("""
+            DELETE FROM role_assignments AS ra
+            USING unnest(
+                CAST(:user_ids AS integer[]),
+                CAST(:department_ids AS integer[]),
+                CAST(:role_names AS varchar[])
+            ) AS v(user_id, department_id, role_name)
+            WHERE ra.user_id = v.user_id
+              AND ra.department_id = v.department_id
+              AND ra.role_name = v.role_name
+            """),
+            {
+                "user_ids": user_ids,
+                "department_ids": department_ids,
+                "role_names": role_names,
+            },
+        )
+        await self.bump_version_for_departments(list(set(department_ids)))
+        await self.session.commit()
+        return result.rowcount
+
+    async def bump_version_for_departments(self, department_ids: list[int]) -> None:
+        await self.session.execute(
+            update(Company)
+            .where(
+                Company.id.in_(
+                    select(Department.company_id).where(
+                        Department.id == any_(literal(department_ids, ARRAY(Integer)))
+                    )
+                )
+            )
+            .values(role_version=Company.role_version + 1)
+        )
+
+    async def get_role_entries(self, user_id: int) -> list:
+        result = await self.session.execute(
+            select(RoleAssignment.department_id, RoleAssignment.role_name).where(
+                RoleAssignment.user_id == user_id
+            )
+        )
+        return result.all()
 
 
 class TaskRepository(SQLAlchemyBaseRepository):
     def __init__(self, session):
         super().__init__(session, Task)
+
+    async def add_many(self, tasks: list[dict]) -> list[int]:
+        """Insert task rows in one statement; ids come back in input order."""
+        if not tasks:
+            return []
+        result = await self.session.execute(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True), tasks
+        )
+        return list(result.scalars().all())
+
+    async def add_participants(
+        self, task_id: int, observer_ids: list[int], executor_ids: list[int]
+    ) -> None:
+        await self.add_participants_many(
+            [(task_id, user_id) for user_id in observer_ids],
+            [(task_id, user_id) for user_id in executor_ids],
+        )
+
+    async def add_participants_many(
+        self,
+        observers: list[tuple[int, int]],
+        executors: list[tuple[int, int]],
+    ) -> None:
+        """Insert (task_id, user_id) pairs into both association tables."""
+        for table, pairs in ((task_observers, observers), (task_executors, executors)):
+            if not pairs:
+                continue
+            task_ids, user_ids = (list(column) for column in zip(*pairs))
+            await self.session.execute(
+                text(f"""
+                INSERT INTO {table.name} (task_id, user_id)
+                SELECT * FROM unnest(
+                    CAST(:task_ids AS integer[]),
+                    CAST(:user_ids AS integer[])
+                )
+                ON CONFLICT DO NOTHING
+                """),
+                {"task_ids": task_ids, "user_ids": user_ids},
+            )
+
+    @staticmethod
+    def _participant_ids(table: Table, label: str) -> Any:
+        return func.coalesce(
+            select(func.array_agg(table.c.user_id))
+            .where(table.c.task_id == Task.id)
+            .scalar_subquery(),
+            literal([], ARRAY(Integer)),
+        ).label(label)
+
+    def _select_rows(self) -> Select:
+        return select(
+            Task.id,
+            Task.title,
+            Task.description,
+            Task.author_id,
+            Task.responsible_id,
+            Task.deadline,
+            Task.estimated_time,
+            Task.status,
+            self._participant_ids(task_observers, "observer_ids"),
+            self._participant_ids(task_executors, "executor_ids"),
+        )
+
+    @staticmethod
+    def _filters(
+        company_id: int,
+        responsible_id: Optional[int] = None,
+        executor_id: Optional[int] = None,
+        observer_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+        status: Optional[TaskStatus] = None,
+        deadline_from: Optional[datetime] = None,
+        deadline_to: Optional[datetime] = None,
+        overdue: bool = False,
+    ) -> list:
+        conditions = [Task.company_id == company_id]
+        if responsible_id is not None:
+            conditions.append(Task.responsible_id == responsible_id)
+        if author_id is not None:
+            conditions.append(Task.author_id == author_id)
+        if executor_id is not None:
+            conditions.append(
+                select(task_executors.c.task_id)
+                .where(
+                    task_executors.c.task_id == Task.id,
+                    task_executors.c.user_id == executor_id,
+                )
+                .exists()
+            )
+        if observer_id is not None:
+            conditions.append(
+                select(task_observers.c.task_id)
+                .where(
+                    task_observers.c.task_id == Task.id,
+                    task_observers.c.user_id == observer_id,
+                )
+                .exists()
+            )
+        if status is not None:
+            conditions.append(Task.status == status)
+        if deadline_from is not None:
+            conditions.append(Task.deadline >= deadline_from)
+        if deadline_to is not None:
+            conditions.append(Task.deadline < deadline_to)
+        if overdue:
+            conditions.append(Task.status.in_(OPEN_TASK_STATUSES))
+            conditions.append(Task.deadline < func.now())
+        return conditions
+
+    async def get_row(self, task_id: int, company_id: int) -> Optional[Any]:
+        """Task columns plus participant id arrays, without loading users."""
+        result = await self.session.execute(
+            self._select_rows().where(
+                Task.id == task_id, Task.company_id == company_id
+            )
+        )
+        return result.one_or_none()
+
+    async def update_fields(
+        self, task_id: int, company_id: int, **values: Any
+    ) -> Optional[int]:
+        result = await self.session.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.company_id == company_id)
+            .values(**values)
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_page(
+        self,
+        company_id: int,
+        after: Optional[int] = None,
+        limit: int = 50,
+        **filters: Any,
+    ) -> list:
+        query = self._select_rows().where(*self._filters(company_id, **filters))
+        if after is not None:
+            query = query.where(Task.id < after)
+
+        result = await self.session.execute(
+            query.order_by(Task.id.desc()).limit(limit)
+        )
+        return result.all()
+
+    async def transition_status(
+        self,
+        company_id: int,
+        status: TaskStatus,
+        allowed_from: list[TaskStatus],
+        ids: Optional[list[int]] = None,
+        filters: Optional[dict] = None,
+        **values: Any,
+    ) -> list:
+        """Set ``status`` (and any extra ``values``) on the company's tasks
+        currently in one of ``allowed_from``, selected by ``ids`` or by
+        list ``filters``. Returns the updated (id, status) rows."""
+        conditions = self._filters(company_id, **(filters or {}))
+        if ids is not None:
+            conditions.append(Task.id == any_(literal(ids, ARRAY(Integer))))
+        result = await self.session.execute(
+            update(Task)
+            .where(*conditions, Task.status.in_(allowed_from))
+            .values(status=status, **values)
+            .returning(Task.id, Task.status)
+            .execution_options(synchronize_session=False)
+        )
+        return result.all()
+
+    async def get_followers(
+        self, company_id: int, task_ids: list[int]
+    ) -> dict[int, set[int]]:
+        """Users following each task: responsible, observers and executors."""
+        if not task_ids:
+            return {}
+        result = await self.session.execute(
+            text("""
+            SELECT t.id AS task_id, t.responsible_id AS user_id
+            FROM tasks AS t
+            WHERE t.company_id = :company_id
+              AND t.id = ANY(CAST(:task_ids AS integer[]))
+            UNION
+            SELECT p.task_id, p.user_id
+            FROM tasks AS t
+            JOIN (
+                SELECT task_id, user_id FROM task_observers
+                UNION ALL
+                SELECT task_id, user_id FROM task_executors
+            ) AS p ON p.task_id = t.id
+            WHERE t.company_id = :company_id
+              AND t.id = ANY(CAST(:task_ids AS integer[]))
+            """),
+            {"company_id": company_id, "task_ids": list(task_ids)},
+        )
+        followers: dict[int, set[int]] = {}
+        for task_id, user_id in result.all():
+            followers.setdefault(task_id, set()).add(user_id)
+        return followers
+
+    async def notify(self, payloads: list[str]) -> None:
+        """Queue NOTIFYs on the task events channel; Postgres delivers them
+        when the transaction commits."""
+        if not payloads:
+            return
+        await self.session.execute(
+            text("""
+            SELECT pg_notify(:channel, payload)
+            FROM unnest(CAST(:payloads AS text[])) AS payload
+            """),
+            {"channel": TASK_EVENTS_CHANNEL, "payloads": payloads},
+        )
+
+    async def count_overdue(self, company_id: int) -> int:
+        result = await self.session.execute(
+            select(func.count())
+            .select_from(Task)
+            .where(*self._filters(company_id, overdue=True))
+        )
+        return result.scalar_one()
+
+    async def get_statuses(self, company_id: int, ids: list[int]) -> dict:
+        result = await self.session.execute(
+            select(Task.id, Task.status).where(
+                Task.company_id == company_id,
+                Task.id == any_(literal(ids, ARRAY(Integer))),
+            )
+        )
+        return dict(result.all())
@@ -1,3 +1,5 @@
+from datetime import datetime
+from enum import Enum
 from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, constr, field_validator
@@ -69,6 +71,24 @@ class UserUpdateRequest(BaseModel):
     position_id: Optional[int] = None
 
 
+class UserResponse(BaseModel):
+    id: int
+    email: EmailStr
+    first_name: str
+    last_name: str
+    is_active: bool
+    manager_id: Optional[int] = None
+    department_id: Optional[int] = None
+    position_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class EmployeeDirectoryPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+
 class ConfirmRegistrationRequest(BaseModel):
     account: EmailStr
     token: str
@@ -79,6 +99,25 @@ class ConfirmRegistrationResponse(BaseModel):
     message: str
 
 
+class SubordinateResponse(BaseModel):
+    id: int
+    email: EmailStr
+    first_name: str
+    last_name: str
+    is_active: bool
+    manager_id: Optional[int] = None
+    department_id: Optional[int] = None
+    position_id: Optional[int] = None
+    depth: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SubordinatePage(BaseModel):
+    items: List[SubordinateResponse]
+    next_cursor: Optional[int] = None
+
+
 class DepartmentBase(BaseModel):
     name: str
     company_id: int
@@ -103,13 +142,47 @@ class DepartmentResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class DepartmentImportNode(BaseModel):
+    name: str
+    children: List["DepartmentImportNode"] = []
+
+
+class DepartmentImportRequest(BaseModel):
+    parent_id: Optional[int] = None
+    departments: List[DepartmentImportNode]
+
+
+class DepartmentMove(BaseModel):
+    department_id: int
+    new_parent_id: Optional[int] = None
+
+
+class DepartmentReorganizeRequest(BaseModel):
+    moves: List[DepartmentMove]
+
+
+class RoleAssignmentItem(BaseModel):
+    user_id: int
+    department_id: int
+    role_name: constr(min_length=1)
+
+
+class RoleAssignmentBulkRequest(BaseModel):
+    assignments: List[RoleAssignmentItem]
+
+
+class SubtreeDeletePolicy(str, Enum):
+    REPARENT = "reparent"
+    DETACH = "detach"
+
+
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
     responsible_id: int
     observer_ids: List[int]
     executor_ids: List[int]
-    deadline: Optional[str] = None
+    deadline: Optional[datetime] = None
     estimated_time: Optional[float] = None
 
 
@@ -119,7 +192,7 @@ class TaskCreate(BaseModel):
     responsible_id: int
     observer_ids: List[int]
     executor_ids: List[int]
-    deadline: Optional[str]
+    deadline: Optional[datetime]
     estimated_time: Optional[float]
     status: Optional[TaskStatus] = TaskStatus.NEW
 
@@ -134,7 +207,7 @@ class TaskUpdate(BaseModel):
     title: Optional[str]
     description: Optional[str]
     status: Optional[TaskStatus]
-    deadline: Optional[str]
+    deadline: Optional[datetime]
     estimated_time: Optional[float]
 
 
@@ -142,11 +215,62 @@ class TaskResponse(BaseModel):
     id: int
     title: str
     description: Optional[str] = None
+    author_id: int
     responsible_id: int
     observer_ids: List[int]
     executor_ids: List[int]
-    deadline: Optional[str] = None
+    deadline: Optional[datetime] = None
     estimated_time: Optional[float] = None
     status: TaskStatus
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[int] = None
+
+
+class TaskBulkCreated(BaseModel):
+    index: int
+    id: int
+
+
+class TaskBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class TaskBulkResult(BaseModel):
+    created: List[TaskBulkCreated]
+    errors: List[TaskBulkError]
+
+
+class TaskFilter(BaseModel):
+    responsible_id: Optional[int] = None
+    executor_id: Optional[int] = None
+    observer_id: Optional[int] = None
+    author_id: Optional[int] = None
+    status: Optional[TaskStatus] = None
+    deadline_from: Optional[datetime] = None
+    deadline_to: Optional[datetime] = None
+    overdue: Optional[bool] = None
+
+
+class TaskStatusBulkUpdate(BaseModel):
+    status: TaskStatus
+    ids: Optional[List[int]] = None
+    filter: Optional[TaskFilter] = None
+    deadline: Optional[datetime] = None
+    estimated_time: Optional[float] = None
+
+
+class TaskStatusChange(BaseModel):
+    id: int
+    status: TaskStatus
+
+
+class TaskStatusBulkResult(BaseModel):
+    updated: List[TaskStatusChange]
+    rejected: List[TaskStatusChange] = []
+    not_found: List[int] = []
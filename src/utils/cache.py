@@ -0,0 +1,35 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class VersionedCache:
+    """Per-process LRU whose entries are valid only for a given version.
+
+    An optional ``ttl`` (seconds) additionally bounds staleness for values
+    that depend on writes which do not bump the version.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[Any, float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        if self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key: Hashable, version: Any, value: Any) -> None:
+        self._entries[key] = (version, time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
@@ -0,0 +1,74 @@
+import csv
+import io
+from collections import deque
+from typing import Any, Iterable, Optional
+
+ImportRow = tuple[str, Optional[str], str]
+
+
+def flatten_import_tree(nodes: Iterable[Any]) -> list[ImportRow]:
+    """Turn nested import nodes (``name`` and ``children``) into
+    (ref, parent_ref, name) rows with generated refs."""
+    rows: list[ImportRow] = []
+    stack = [(node, None) for node in reversed(list(nodes))]
+    while stack:
+        node, parent_ref = stack.pop()
+        ref = str(len(rows))
+        rows.append((ref, parent_ref, node.name))
+        stack.extend((child, ref) for child in reversed(node.children))
+    return rows
+
+
+def parse_import_csv(content: str) -> list[ImportRow]:
+    """Read ``id,parent_id,name`` CSV rows; ids are local to the file."""
+    reader = csv.DictReader(io.StringIO(content))
+    missing = {"id", "parent_id", "name"} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+
+    rows: list[ImportRow] = []
+    for row in reader:
+        short = [key for key in ("id", "parent_id", "name") if row.get(key) is None]
+        if short:
+            raise ValueError(
+                f"CSV line {reader.line_num} is missing {', '.join(short)}"
+            )
+        rows.append(
+            (row["id"].strip(), row["parent_id"].strip() or None, row["name"].strip())
+        )
+    return rows
+
+
+def order_import_rows(rows: list[ImportRow]) -> list[ImportRow]:
+    """Validate rows as a forest and return them parents-first.
+
+    Raises ValueError on duplicate or unknown refs, empty names and cycles.
+    """
+    by_ref: dict[str, ImportRow] = {}
+    children: dict[Optional[str], list[str]] = {}
+    for row in rows:
+        ref, parent_ref, name = row
+        if not name:
+            raise ValueError(f"Department {ref} has an empty name")
+        if ref in by_ref:
+            raise ValueError(f"Duplicate department id {ref}")
+        by_ref[ref] = row
+        children.setdefault(parent_ref, []).append(ref)
+
+    for ref, parent_ref, _ in rows:
+        if parent_ref is not None and parent_ref not in by_ref:
+            raise ValueError(f"Department {ref} references unknown parent {parent_ref}")
+
+    ordered: list[ImportRow] = []
+    queue = deque(children.get(None, []))
+    while queue:
+        ref = queue.popleft()
+        ordered.append(by_ref[ref])
+        queue.extend(children.get(ref, []))
+
+    if len(ordered) != len(rows):
+        reached = {row[0] for row in ordered}
+        cyclic = sorted(ref for ref in by_ref if ref not in reached)
+        raise ValueError(f"Cycle detected among departments: {', '.join(cyclic)}")
+
+    return ordered
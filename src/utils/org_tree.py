@@ -0,0 +1,197 @@
+from array import array
+from typing import Any, Iterable, Optional
+
+from .cache import VersionedCache
+
+
+class OrgTree:
+    """Array-backed snapshot of one company's department tree.
+
+    Nodes are stored in pre-order, so a node's position is its pre-order
+    number and every subtree occupies a contiguous run of positions;
+    ``ends[pos]`` is the position just past that run.
+    """
+
+    __slots__ = ("ids", "parents", "names", "post", "ends", "_index")
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.parents = array("l")
+        self.names: list[str] = []
+        self.post = array("l")
+        self.ends = array("l")
+        self._index: dict[int, int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, str, str]]) -> "OrgTree":
+        """Build a tree from (id, path, name) rows ordered by path."""
+        tree = cls()
+        stack: list[int] = []
+        counter = 0
+
+        for dep_id, path, name in rows:
+            labels = str(path).split(".")
+            parent_pos = tree._index.get(int(labels[-2])) if len(labels) > 1 else None
+
+            while stack and stack[-1] != parent_pos:
+                done = stack.pop()
+                tree.post[done] = counter
+                tree.ends[done] = len(tree.ids)
+                counter += 1
+
+            pos = len(tree.ids)
+            tree.ids.append(dep_id)
+            tree.parents.append(-1 if parent_pos is None else parent_pos)
+            tree.names.append(name)
+            tree.post.append(-1)
+            tree.ends.append(-1)
+            tree._index[dep_id] = pos
+            stack.append(pos)
+
+        while stack:
+            done = stack.pop()
+            tree.post[done] = counter
+            tree.ends[done] = len(tree.ids)
+            counter += 1
+
+        return tree
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, dep_id: int) -> bool:
+        return dep_id in self._index
+
+    def position(self, dep_id: int) -> int:
+        try:
+            return self._index[dep_id]
+        except KeyError:
+            raise ValueError("Department not found") from None
+
+    def is_ancestor(self, ancestor_pos: int, pos: int) -> bool:
+        return ancestor_pos <= pos and self.post[pos] <= self.post[ancestor_pos]
+
+    def descendants(self, dep_id: int) -> list[int]:
+        """Positions of the department and its whole subtree, in pre-order."""
+        root = self.position(dep_id)
+        return list(range(root, self.ends[root]))
+
+    def descendant_count(self, dep_id: int) -> int:
+        """Number of departments below this one, excluding itself."""
+        root = self.position(dep_id)
+        return self.ends[root] - root - 1
+
+    def ancestors(self, dep_id: int) -> list[int]:
+        """Positions from the tree root down to the department itself."""
+        pos = self.position(dep_id)
+        chain = []
+        while pos != -1:
+            chain.append(pos)
+            pos = self.parents[pos]
+        chain.reverse()
+        return chain
+
+    def visualized_path(self, dep_id: int) -> str:
+        return ".".join(self.names[pos] for pos in self.ancestors(dep_id))
+
+
+def _materialize_paths(
+    tree: OrgTree, parents: list[int]
+) -> tuple[list[str], list[str]]:
+    paths: list[Optional[str]] = [None] * len(tree)
+    name_paths: list[Optional[str]] = [None] * len(tree)
+
+    for start in range(len(tree)):
+        chain: list[int] = []
+        on_chain: set[int] = set()
+        pos = start
+        while pos != -1 and paths[pos] is None:
+            if pos in on_chain:
+                raise ValueError(
+                    f"Cycle detected at department {tree.ids[pos]}"
+                )
+            chain.append(pos)
+            on_chain.add(pos)
+            pos = parents[pos]
+
+        base_path = paths[pos] if pos != -1 else None
+        base_name_path = name_paths[pos] if pos != -1 else None
+        for pos in reversed(chain):
+            label, name = str(tree.ids[pos]), tree.names[pos]
+            paths[pos] = f"{base_path}.{label}" if base_path else label
+            name_paths[pos] = f"{base_name_path}.{name}" if base_name_path else name
+            base_path, base_name_path = paths[pos], name_paths[pos]
+
+    return paths, name_paths
+
+
+def plan_reorganization(
+    tree: OrgTree, moves: dict[int, Optional[int]]
+) -> list[tuple[int, str, str]]:
+    """Apply (department -> new parent) moves to the tree in memory.
+
+    Returns (id, path, name_path) for every department whose path changes.
+    A new parent of None makes the department a root. Raises ValueError
+    for unknown departments and for moves that would create a cycle.
+    """
+    parents = list(tree.parents)
+    for dep_id, new_parent_id in moves.items():
+        parents[tree.position(dep_id)] = (
+            -1 if new_parent_id is None else tree.position(new_parent_id)
+        )
+
+    old_paths, _ = _materialize_paths(tree, list(tree.parents))
+    new_paths, new_name_paths = _materialize_paths(tree, parents)
+    return [
+        (tree.ids[pos], new_paths[pos], new_name_paths[pos])
+        for pos in range(len(tree))
+        if new_paths[pos] != old_paths[pos]
+    ]
+
+
+def build_org_chart(rows: Iterable[Any]) -> list[dict]:
+    """Nest rows ordered by path into a chart in a single pass.
+
+    Each row carries id, path, name, manager_id, manager_first_name and
+    manager_last_name.
+    """
+    nodes: dict[int, dict] = {}
+    roots: list[dict] = []
+
+    for row in rows:
+        manager = None
+        if row.manager_id is not None:
+            manager = {
+                "id": row.manager_id,
+                "first_name": row.manager_first_name,
+                "last_name": row.manager_last_name,
+            }
+        node = {"id": row.id, "name": row.name, "manager": manager, "children": []}
+        nodes[row.id] = node
+
+        labels = str(row.path).split(".")
+        parent = nodes.get(int(labels[-2])) if len(labels) > 1 else None
+        if parent is None:
+            roots.append(node)
+        else:
+            parent["children"].append(node)
+
+    return roots
+
+
+org_tree_cache = VersionedCache()
+
+
+async def get_org_tree(
+    repository: Any, company_id: int, version: Optional[int] = None
+) -> OrgTree:
+    """Return the company's tree from the cache, rebuilding it through the
+    department repository when the department version has moved on."""
+    if version is None:
+        version = await repository.get_version(company_id)
+    tree = org_tree_cache.get(company_id, version)
+    if tree is None:
+        rows = await repository.get_tree_rows(company_id)
+        tree = OrgTree.from_rows(rows)
+        org_tree_cache.put(company_id, version, tree)
+    return tree
@@ -0,0 +1,33 @@
+import base64
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(
+    cursor: Optional[str], types: tuple[type, ...]
+) -> Optional[list[Any]]:
+    """Decode a cursor made by ``encode_cursor`` whose values must match
+    ``types`` position by position; anything else is a 400."""
+    if cursor is None:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(
+            isinstance(value, kind) and not isinstance(value, bool)
+            for value, kind in zip(values, types)
+        )
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return values
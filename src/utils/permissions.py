@@ -0,0 +1,43 @@
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException
+
+from .cache import VersionedCache
+from .org_tree import get_org_tree
+
+if TYPE_CHECKING:
+    from .unit_of_work import UnitOfWork
+
+role_entry_cache = VersionedCache(maxsize=100_000)
+
+
+async def resolve_effective_roles(
+    uow: "UnitOfWork", company_id: int, user_id: int, department_id: int
+) -> set[str]:
+    """Roles a user holds on a department, including roles assigned on any
+    of its ancestors. Must be called inside ``async with uow``.
+
+    Assignments are cached per user as (department_id, role) entries keyed
+    by the company's role version; inheritance is resolved against the
+    cached org tree, so moves never invalidate the role entries.
+    """
+    versions = await uow.company.get_versions(company_id)
+    if versions is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    tree = await get_org_tree(uow.department, company_id, versions.department_version)
+    if department_id not in tree:
+        raise HTTPException(status_code=404, detail="Department not found")
+    target = tree.position(department_id)
+
+    entries = role_entry_cache.get((company_id, user_id), versions.role_version)
+    if entries is None:
+        rows = await uow.role_assignment.get_role_entries(user_id)
+        entries = [(row.department_id, row.role_name) for row in rows]
+        role_entry_cache.put((company_id, user_id), versions.role_version, entries)
+
+    return {
+        role_name
+        for assigned_id, role_name in entries
+        if assigned_id in tree and tree.is_ancestor(tree.position(assigned_id), target)
+    }
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_CHANNEL = "task_events"
+
+# Recipients per NOTIFY; keeps payloads well under Postgres' 8000-byte cap.
+RECIPIENTS_PER_PAYLOAD = 500
+
+# Marker put on a subscriber queue that overflowed; the stream closes on it.
+OVERFLOW = object()
+
+
+def build_payloads(
+    event: str, company_id: int, followers: dict[int, set[int]]
+) -> list[str]:
+    """Serialize one event per task, split into several NOTIFY payloads
+    when a task has more followers than fit in one."""
+    payloads = []
+    for task_id, user_ids in followers.items():
+        ordered = sorted(user_ids)
+        for start in range(0, max(len(ordered), 1), RECIPIENTS_PER_PAYLOAD):
+            payloads.append(
+                json.dumps(
+                    {
+                        "event": event,
+                        "id": task_id,
+                        "company_id": company_id,
+                        "user_ids": ordered[start:start + RECIPIENTS_PER_PAYLOAD],
+                    },
+                    separators=(",", ":"),
+                )
+            )
+    return payloads
+
+
+class TaskEventBroker:
+    """Fans task NOTIFY payloads out to per-user subscriber queues.
+
+    Each worker holds one LISTEN connection, opened by ``start`` from the
+    app lifespan. Queues are bounded: a subscriber that falls ``maxsize``
+    events behind is cut off with ``OVERFLOW`` rather than buffering
+    without limit, and the client is expected to reconnect and refetch.
+    When the LISTEN connection drops, notifications sent meanwhile are
+    lost, so every subscriber is cut off the same way and the connection
+    is reopened in the background (and again on subscribe if that fails).
+    """
+
+    def __init__(self, maxsize: int = 100) -> None:
+        self.maxsize = maxsize
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._engine: Optional[AsyncEngine] = None
+        self._connection: Optional[AsyncConnection] = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    async def start(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        await self._ensure_listening()
+
+    async def subscribe(self, user_id: int) -> asyncio.Queue:
+        await self._ensure_listening()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.maxsize)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def publish(self, event: dict[str, Any]) -> None:
+        for user_id in set(event.get("user_ids") or []):
+            for queue in list(self._subscribers.get(user_id, ())):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._cut_off(user_id, queue)
+
+    def _cut_off(self, user_id: int, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(OVERFLOW)
+        self.unsubscribe(user_id, queue)
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._connection is not None:
+                if not self._connection.closed:
+                    # Detach first so the pooled connection does not report
+                    # its eventual disposal as a lost LISTEN connection.
+                    raw = await self._connection.get_raw_connection()
+                    driver = raw.driver_connection
+                    driver.remove_termination_listener(self._on_termination)
+                    if not driver.is_closed():
+                        await driver.remove_listener(
+                            TASK_EVENTS_CHANNEL, self._on_notify
+                        )
+                await self._connection.close()
+                self._connection = None
+
+    async def _ensure_listening(self) -> None:
+        if self._engine is None:
+            raise RuntimeError("TaskEventBroker.start() has not been called")
+        async with self._lock:
+            if self._connection is not None and not self._connection.closed:
+                raw = await self._connection.get_raw_connection()
+                if not raw.driver_connection.is_closed():
+                    return
+                raw.driver_connection.remove_termination_listener(
+                    self._on_termination
+                )
+                await self._connection.invalidate()
+            self._connection = await self._engine.connect()
+            raw = await self._connection.get_raw_connection()
+            await raw.driver_connection.add_listener(
+                TASK_EVENTS_CHANNEL, self._on_notify
+            )
+            raw.driver_connection.add_termination_listener(self._on_termination)
+
+    def _on_termination(self, connection: Any) -> None:
+        logger.warning("Task events connection lost; reconnecting")
+        for user_id, queues in list(self._subscribers.items()):
+            for queue in list(queues):
+                self._cut_off(user_id, queue)
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        try:
+            await self._ensure_listening()
+        except Exception:
+            logger.exception("Task events reconnect failed; retrying on subscribe")
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning("Ignoring malformed task event: %s", payload)
+            return
+        self.publish(event)
+
+
+task_events = TaskEventBroker()
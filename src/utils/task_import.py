@@ -0,0 +1,50 @@
+import json
+from typing import Any
+
+from pydantic import ValidationError
+
+from schemas.schemas import TaskBulkError, TaskCreate
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def _first_error(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def parse_bulk_tasks(
+    content: str, content_type: str = "application/json"
+) -> tuple[list[tuple[int, TaskCreate]], list[TaskBulkError]]:
+    """Parse a JSON array or NDJSON body into (index, TaskCreate) items.
+
+    Malformed items are reported by index instead of failing the batch;
+    a body that is not a JSON array at all raises ValueError.
+    """
+    raw: list[tuple[int, Any]] = []
+    errors: list[TaskBulkError] = []
+
+    if content_type.split(";")[0].strip().lower() in NDJSON_TYPES:
+        lines = [line for line in content.splitlines() if line.strip()]
+        for index, line in enumerate(lines):
+            try:
+                raw.append((index, json.loads(line)))
+            except json.JSONDecodeError as e:
+                errors.append(TaskBulkError(index=index, detail=f"Invalid JSON: {e.msg}"))
+    else:
+        try:
+            payload = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}")
+        if not isinstance(payload, list):
+            raise ValueError("Expected a JSON array of tasks")
+        raw = list(enumerate(payload))
+
+    items: list[tuple[int, TaskCreate]] = []
+    for index, data in raw:
+        try:
+            items.append((index, TaskCreate.model_validate(data)))
+        except ValidationError as e:
+            errors.append(TaskBulkError(index=index, detail=_first_error(e)))
+    return items, errors
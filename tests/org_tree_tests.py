@@ -0,0 +1,132 @@
+from collections import namedtuple
+
+import pytest
+
+from utils.cache import VersionedCache
+from utils.org_import import order_import_rows, parse_import_csv
+from utils.org_tree import OrgTree, build_org_chart, plan_reorganization
+
+
+ROWS = [
+    (1, "1", "Head Office"),
+    (2, "1.2", "Sales"),
+    (4, "1.2.4", "Retail"),
+    (3, "1.3", "Engineering"),
+    (5, "5", "Branch"),
+]
+
+
+def test_descendants_are_contiguous_subtree():
+    tree = OrgTree.from_rows(ROWS)
+
+    assert [tree.ids[pos] for pos in tree.descendants(1)] == [1, 2, 4, 3]
+    assert [tree.ids[pos] for pos in tree.descendants(2)] == [2, 4]
+    assert [tree.ids[pos] for pos in tree.descendants(5)] == [5]
+
+
+def test_descendant_count_uses_subtree_interval():
+    tree = OrgTree.from_rows(ROWS)
+
+    assert tree.descendant_count(1) == 3
+    assert tree.descendant_count(2) == 1
+    assert tree.descendant_count(4) == 0
+    assert tree.descendant_count(5) == 0
+
+
+def test_ancestors_and_visualized_path():
+    tree = OrgTree.from_rows(ROWS)
+
+    assert [tree.ids[pos] for pos in tree.ancestors(4)] == [1, 2, 4]
+    assert tree.visualized_path(4) == "Head Office.Sales.Retail"
+    assert tree.is_ancestor(tree.position(1), tree.position(4))
+    assert not tree.is_ancestor(tree.position(3), tree.position(4))
+
+
+def test_cache_is_invalidated_by_version():
+    cache = VersionedCache()
+    tree = OrgTree.from_rows(ROWS)
+    cache.put(1, 7, tree)
+
+    assert cache.get(1, 7) is tree
+    assert cache.get(1, 8) is None
+
+
+def test_import_rows_are_ordered_parents_first():
+    rows = parse_import_csv("id,parent_id,name\nb,a,Sales\na,,Head Office\nc,b,Retail\n")
+
+    assert [ref for ref, _, _ in order_import_rows(rows)] == ["a", "b", "c"]
+
+
+def test_parse_import_csv_rejects_short_rows():
+    with pytest.raises(ValueError, match="CSV line 3 is missing name"):
+        parse_import_csv("id,parent_id,name\na,,Head Office\nb,a\n")
+
+
+def test_import_rejects_cycles():
+    rows = [("a", None, "Head Office"), ("b", "c", "Sales"), ("c", "b", "Retail")]
+
+    with pytest.raises(ValueError, match="Cycle detected"):
+        order_import_rows(rows)
+
+
+def test_build_org_chart_nests_children_and_managers():
+    Row = namedtuple(
+        "Row", "id path name manager_id manager_first_name manager_last_name"
+    )
+    rows = [
+        Row(1, "1", "Head Office", 10, "Ada", "Lovelace"),
+        Row(2, "1.2", "Sales", None, None, None),
+        Row(4, "1.2.4", "Retail", None, None, None),
+        Row(3, "1.3", "Engineering", None, None, None),
+        Row(5, "5", "Branch", None, None, None),
+    ]
+
+    chart = build_org_chart(rows)
+
+    assert [node["id"] for node in chart] == [1, 5]
+    head = chart[0]
+    assert head["manager"] == {"id": 10, "first_name": "Ada", "last_name": "Lovelace"}
+    assert [child["id"] for child in head["children"]] == [2, 3]
+    assert [child["id"] for child in head["children"][0]["children"]] == [4]
+    assert chart[1]["manager"] is None and chart[1]["children"] == []
+
+
+def test_plan_reorganization_rewrites_moved_subtrees():
+    tree = OrgTree.from_rows(ROWS)
+
+    updates = plan_reorganization(tree, {2: 5})
+
+    assert sorted(updates) == [
+        (2, "5.2", "Branch.Sales"),
+        (4, "5.2.4", "Branch.Sales.Retail"),
+    ]
+
+
+def test_plan_reorganization_moves_into_a_moved_subtree():
+    tree = OrgTree.from_rows(ROWS)
+
+    updates = plan_reorganization(tree, {2: 5, 3: 4})
+
+    assert dict((dep_id, path) for dep_id, path, _ in updates) == {
+        2: "5.2",
+        4: "5.2.4",
+        3: "5.2.4.3",
+    }
+
+
+def test_plan_reorganization_rejects_cycles():
+    tree = OrgTree.from_rows(ROWS)
+
+    with pytest.raises(ValueError, match="Cycle detected"):
+        plan_reorganization(tree, {2: 4})
+    with pytest.raises(ValueError, match="Cycle detected"):
+        plan_reorganization(tree, {1: 5, 5: 3})
+
+
+def test_plan_reorganization_rejects_unknown_departments():
+    tree = OrgTree.from_rows(ROWS)
+
+    with pytest.raises(ValueError, match="Department not found"):
+        plan_reorganization(tree, {99: 1})
+    with pytest.raises(ValueError, match="Department not found"):
+        plan_reorganization(tree, {2: 99})
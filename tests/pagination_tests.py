@@ -0,0 +1,39 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+
+from utils.pagination import decode_cursor, encode_cursor
+
+DIRECTORY = (str, str, int)
+
+
+def _raw(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["Łukasiewicz", "Jan", 42])
+
+    assert decode_cursor(cursor, DIRECTORY) == ["Łukasiewicz", "Jan", 42]
+    assert decode_cursor(None, DIRECTORY) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        "żółw",
+        _raw("{not json"),
+        _raw('{"last_name": "Doe"}'),
+        _raw('["Doe", "Jane"]'),
+        _raw('["Doe", "Jane", "42; DROP TABLE users"]'),
+        _raw('["Doe", "Jane", true]'),
+        _raw('[1, "Jane", 42]'),
+    ],
+)
+def test_malformed_or_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, DIRECTORY)
+
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,93 @@
+import asyncio
+from collections import namedtuple
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from utils.permissions import resolve_effective_roles
+
+Versions = namedtuple("Versions", "department_version manager_version role_version")
+RoleEntry = namedtuple("RoleEntry", "department_id role_name")
+
+TREE = [
+    (1, "1", "Head Office"),
+    (2, "1.2", "Sales"),
+    (4, "1.2.4", "Retail"),
+    (3, "1.3", "Engineering"),
+]
+
+
+class FakeUow:
+    """Just the repository calls resolve_effective_roles makes."""
+
+    def __init__(self, tree, entries):
+        self.versions = Versions(1, 1, 1)
+        self.tree = tree
+        self.entries = entries
+        self.role_queries = 0
+        self.company = SimpleNamespace(get_versions=self._get_versions)
+        self.department = SimpleNamespace(get_tree_rows=self._get_tree_rows)
+        self.role_assignment = SimpleNamespace(get_role_entries=self._get_role_entries)
+
+    async def _get_versions(self, company_id):
+        return self.versions
+
+    async def _get_tree_rows(self, company_id):
+        return self.tree
+
+    async def _get_role_entries(self, user_id):
+        self.role_queries += 1
+        return [RoleEntry(*entry) for entry in self.entries]
+
+
+def _resolve(uow, company_id, department_id, user_id=10):
+    return asyncio.run(
+        resolve_effective_roles(uow, company_id, user_id, department_id)
+    )
+
+
+def test_roles_are_inherited_from_ancestors_only():
+    uow = FakeUow(TREE, [(2, "manager"), (1, "viewer"), (3, "editor")])
+
+    assert _resolve(uow, 101, 4) == {"manager", "viewer"}
+    assert _resolve(uow, 101, 2) == {"manager", "viewer"}
+    assert _resolve(uow, 101, 3) == {"editor", "viewer"}
+    assert _resolve(uow, 101, 1) == {"viewer"}
+
+
+def test_role_version_bump_invalidates_cached_entries():
+    uow = FakeUow(TREE, [(2, "manager")])
+
+    assert _resolve(uow, 102, 4) == {"manager"}
+    uow.entries = [(3, "manager")]
+    assert _resolve(uow, 102, 4) == {"manager"}
+    assert uow.role_queries == 1
+
+    uow.versions = uow.versions._replace(role_version=2)
+    assert _resolve(uow, 102, 4) == set()
+    assert uow.role_queries == 2
+
+
+def test_moves_reuse_cached_entries_against_the_new_tree():
+    uow = FakeUow(TREE, [(2, "manager")])
+
+    assert _resolve(uow, 103, 4) == {"manager"}
+    uow.tree = [
+        (1, "1", "Head Office"),
+        (2, "1.2", "Sales"),
+        (3, "1.3", "Engineering"),
+        (4, "1.3.4", "Retail"),
+    ]
+    uow.versions = uow.versions._replace(department_version=2)
+
+    assert _resolve(uow, 103, 4) == set()
+    assert uow.role_queries == 1
+
+
+def test_unknown_department_is_not_found():
+    uow = FakeUow(TREE, [])
+
+    with pytest.raises(HTTPException) as excinfo:
+        _resolve(uow, 104, 99)
+    assert excinfo.value.status_code == 404
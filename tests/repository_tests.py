@@ -0,0 +1,38 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from repository.repository import UserRepository
+
+
+class RecordingSession:
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def first(self):
+        return self.row
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_is_in_reporting_line_is_one_manager_path_lookup():
+    session = RecordingSession(row=(7,))
+
+    assert asyncio.run(UserRepository(session).is_in_reporting_line(7, 3)) is True
+    assert len(session.statements) == 1
+    sql = _compile(session.statements[0])
+    assert "users_1.manager_path <@ users_2.manager_path" in sql
+    assert "users_1.id != users_2.id" in sql
+
+
+def test_is_in_reporting_line_is_false_without_a_match():
+    session = RecordingSession(row=None)
+
+    assert asyncio.run(UserRepository(session).is_in_reporting_line(7, 3)) is False
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from utils.task_events import OVERFLOW, TaskEventBroker, build_payloads
+
+
+def _subscribe(broker, user_id):
+    queue = asyncio.Queue(maxsize=broker.maxsize)
+    broker._subscribers.setdefault(user_id, set()).add(queue)
+    return queue
+
+
+def test_publish_routes_events_to_participants_only():
+    broker = TaskEventBroker()
+    follower, other = _subscribe(broker, 1), _subscribe(broker, 2)
+
+    broker.publish({"event": "updated", "id": 7, "user_ids": [1, 3]})
+
+    assert follower.get_nowait()["id"] == 7
+    assert other.empty()
+
+
+def test_slow_subscriber_is_cut_off_on_overflow():
+    broker = TaskEventBroker(maxsize=2)
+    queue = _subscribe(broker, 1)
+
+    for task_id in range(3):
+        broker.publish({"event": "updated", "id": task_id, "user_ids": [1]})
+
+    assert queue.get_nowait() is OVERFLOW
+    assert queue.empty()
+    assert 1 not in broker._subscribers
+
+
+def test_lost_connection_cuts_off_every_subscriber():
+    async def scenario():
+        broker = TaskEventBroker()
+        reconnects = []
+
+        async def reconnect():
+            reconnects.append(True)
+
+        broker._reconnect = reconnect
+        first, second = _subscribe(broker, 1), _subscribe(broker, 2)
+        first.put_nowait({"event": "updated", "id": 7, "user_ids": [1]})
+
+        broker._on_termination(None)
+        await broker._reconnect_task
+
+        assert first.get_nowait() is OVERFLOW and first.empty()
+        assert second.get_nowait() is OVERFLOW
+        assert broker._subscribers == {}
+        assert reconnects == [True]
+
+    asyncio.run(scenario())
+
+
+def test_payloads_are_split_to_stay_under_the_notify_limit():
+    followers = {7: set(range(1, 1201)), 8: {5}}
+
+    payloads = build_payloads("updated", 3, followers)
+
+    assert len(payloads) == 4
+    assert all(len(payload.encode()) < 8000 for payload in payloads)
+    events = [json.loads(payload) for payload in payloads]
+    assert {event["id"] for event in events} == {7, 8}
+    assert sorted(
+        user_id for event in events if event["id"] == 7 for user_id in event["user_ids"]
+    ) == list(range(1, 1201))
@@ -0,0 +1,32 @@
+import pytest
+
+from utils.task_import import parse_bulk_tasks
+
+TASK = (
+    '{"title": "Write report", "description": null, "responsible_id": 1, '
+    '"observer_ids": [2], "executor_ids": [3], "deadline": null, '
+    '"estimated_time": null}'
+)
+
+
+def test_parse_json_array_reports_invalid_items_by_index():
+    items, errors = parse_bulk_tasks(f'[{TASK}, {{"title": "x"}}, {TASK}]')
+
+    assert [index for index, _ in items] == [0, 2]
+    assert items[0][1].observer_ids == [2]
+    assert [error.index for error in errors] == [1]
+
+
+def test_parse_ndjson_skips_blank_lines_and_bad_json():
+    items, errors = parse_bulk_tasks(
+        f"{TASK}\n\n{{not json\n{TASK}\n", "application/x-ndjson"
+    )
+
+    assert [index for index, _ in items] == [0, 2]
+    assert errors[0].index == 1
+    assert errors[0].detail.startswith("Invalid JSON")
+
+
+def test_parse_rejects_non_array_body():
+    with pytest.raises(ValueError):
+        parse_bulk_tasks(TASK)